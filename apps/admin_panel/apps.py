@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AdminPanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.admin_panel'
+
+    def ready(self):
+        # Register the user-change cache invalidation receivers.
+        import apps.admin_panel.utils  # noqa: F401
@@ -2,12 +2,14 @@ from django import forms
 from apps.budgets.models import BudgetAllocation, ApprovedBudget, DepartmentPRE
 from apps.user_accounts.models import User
 from django.contrib.auth.hashers import make_password
-from decimal import Decimal
 
 class BudgetAllocationForm(forms.ModelForm):
     # Field to select Approved Budget (for dropdown selection)
     approved_budget = forms.ModelChoiceField(
-        queryset=ApprovedBudget.objects.filter(is_active=True, remaining_budget__gt=0),
+        # Validation only needs the balance; __str__ needs title/fiscal_year/amount
+        queryset=ApprovedBudget.objects.filter(is_active=True, remaining_budget__gt=0).only(
+            'id', 'title', 'fiscal_year', 'amount', 'remaining_budget'
+        ),
         empty_label="--Select Approved Budget--",
         required=False, # We handle requirements and instance fallback in the clean() method
         widget=forms.Select(attrs={
@@ -52,8 +54,8 @@ class BudgetAllocationForm(forms.ModelForm):
         if self.instance.pk:
             current_allocation = self.instance
             
-            # Need a safe fallback if get_total_used doesn't exist on the model
-            total_used = getattr(current_allocation, 'get_total_used', lambda: Decimal('0.00'))()
+            # PR + AD usage columns are kept current on approval; no query needed
+            total_used = current_allocation.get_total_used()
             
             if allocated_amount < total_used:
                 self.add_error('allocated_amount', f"Cannot reduce allocation below amount already used (₱{total_used:,.2f})")
@@ -71,7 +73,8 @@ class BudgetAllocationForm(forms.ModelForm):
                 return
             
             try:
-                self.end_user = User.objects.get(id=end_user_id)
+                # The view only reads department and full name off the end user
+                self.end_user = User.objects.only('id', 'fullname', 'department').get(id=end_user_id)
             except User.DoesNotExist:
                 self.add_error(None, "Invalid User selected.")
                 return
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-16 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audittrail',
+            index=models.Index(fields=['-timestamp'], name='audit_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audittrail',
+            index=models.Index(fields=['user', '-timestamp'], name='audit_user_timestamp_idx'),
+        ),
+    ]
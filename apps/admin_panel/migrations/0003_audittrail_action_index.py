@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-16 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0002_audittrail_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audittrail',
+            index=models.Index(fields=['action', '-timestamp'], name='audit_action_timestamp_idx'),
+        ),
+    ]
@@ -28,6 +28,11 @@ class AuditTrail(models.Model):
         ordering = ['-timestamp']
         verbose_name = "Audit Trail"
         verbose_name_plural = "Audit Trails"
+        indexes = [
+            models.Index(fields=['-timestamp'], name='audit_timestamp_idx'),
+            models.Index(fields=['user', '-timestamp'], name='audit_user_timestamp_idx'),
+            models.Index(fields=['action', '-timestamp'], name='audit_action_timestamp_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.action} - {self.timestamp}"
@@ -1,3 +1,235 @@
-from django.test import TestCase
+import json
+from datetime import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.admin_panel.models import AuditTrail
+from apps.admin_panel.views import (
+    BULK_USER_ACTION_MAX_BODY,
+    AuditTrailListView,
+    BudgetAllocationListView,
+    PRERequestListView,
+    date_range_q,
+)
+from apps.budgets.models import ApprovedBudget, BudgetAllocation, DepartmentPRE
+from apps.user_accounts.models import User
+
+
+def local_time(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class DateRangeQTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for label, moment in [
+            ('before', local_time(2025, 12, 31, 23, 59, 59)),
+            ('start', local_time(2026, 1, 1, 0, 0)),
+            ('end', local_time(2026, 1, 31, 23, 59, 59)),
+            ('after', local_time(2026, 2, 1, 0, 0)),
+        ]:
+            log = AuditTrail.objects.create(action='UPDATE', model_name='Test', detail=label)
+            # timestamp is auto_now_add, so set it afterwards
+            AuditTrail.objects.filter(pk=log.pk).update(timestamp=moment)
+
+    def details(self, date_from, date_to):
+        return set(
+            AuditTrail.objects.filter(date_range_q('timestamp', date_from, date_to))
+            .values_list('detail', flat=True)
+        )
+
+    def test_both_ends_inclusive_in_local_time(self):
+        self.assertEqual(self.details('2026-01-01', '2026-01-31'), {'start', 'end'})
+
+    def test_open_ended_ranges(self):
+        self.assertEqual(self.details('2026-01-01', ''), {'start', 'end', 'after'})
+        self.assertEqual(self.details('', '2026-01-31'), {'before', 'start', 'end'})
+
+    def test_single_day(self):
+        self.assertEqual(self.details('2026-02-01', '2026-02-01'), {'after'})
+
+    def test_unparseable_dates_are_ignored(self):
+        self.assertEqual(self.details('not-a-date', '2026-01-31'), {'before', 'start', 'end', 'after'})
+
+
+class BulkUserActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_admin('admin', 'Admin User', 'admin@example.com', 'pass1234')
+        cls.users = [
+            User.objects.create_user(
+                f'user{i}', f'User {i}', f'user{i}@example.com', 'pass1234', department='Registrar'
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('bulk_user_action')
+
+    def post(self, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(self.url, body, content_type='application/json')
+
+    def test_rejects_malformed_json(self):
+        response = self.post('{not json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_non_integer_ids(self):
+        response = self.post({'action': 'activate', 'user_ids': ['abc']})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_non_object_payload(self):
+        response = self.post([1, 2, 3])
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_oversized_payload(self):
+        response = self.post({'action': 'activate', 'user_ids': list(range(BULK_USER_ACTION_MAX_BODY))})
+        self.assertEqual(response.status_code, 413)
+
+    def test_requires_a_selection(self):
+        response = self.post({'action': 'activate', 'user_ids': []})
+        self.assertEqual(response.json(), {'success': False, 'message': 'No users selected.'})
+
+    def test_requires_a_known_action(self):
+        response = self.post({'action': 'delete', 'user_ids': [self.users[0].pk]})
+        self.assertEqual(response.json(), {'success': False, 'message': 'Invalid action.'})
+
+    def test_deactivate_skips_self_and_audits_each_user(self):
+        ids = [self.admin.pk] + [user.pk for user in self.users]
+
+        response = self.post({'action': 'deactivate', 'user_ids': ids})
+
+        self.assertEqual(response.json(), {'success': True, 'message': '3 users deactivated.'})
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+        self.assertFalse(User.objects.filter(pk__in=ids[1:], is_active=True).exists())
+        self.assertEqual(
+            set(AuditTrail.objects.filter(action='DEACTIVATE_USER').values_list('record_id', flat=True)),
+            {str(pk) for pk in ids[1:]},
+        )
+
+
+class PRERequestListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_admin('admin', 'Admin User', 'admin@example.com', 'pass1234')
+        budget = ApprovedBudget.objects.create(
+            title='Annual Budget 2026', fiscal_year='2026', amount=Decimal('100000.00')
+        )
+        allocation = BudgetAllocation.objects.create(
+            approved_budget=budget, department='Registrar', end_user=cls.admin,
+            allocated_amount=Decimal('1000.00'), remaining_balance=Decimal('1000.00'),
+        )
+        statuses = ['Pending'] * 8 + ['Approved'] * 4 + ['Draft'] * 3
+        for status in statuses:
+            DepartmentPRE.objects.create(
+                submitted_by=cls.admin, department='Registrar', fiscal_year='2026',
+                budget_allocation=allocation, status=status, submitted_at=timezone.now(),
+            )
+        DepartmentPRE.objects.create(
+            submitted_by=cls.admin, department='Registrar', fiscal_year='2026',
+            budget_allocation=allocation, status='Pending', is_archived=True,
+        )
+
+    def test_count_is_exact(self):
+        view = PRERequestListView()
+        view.setup(RequestFactory().get('/'))
+        view.request.user = self.admin
+
+        paginator, page, _, is_paginated = view.paginate_queryset(view.get_queryset(), view.paginate_by)
+
+        # Drafts and archived PREs are not listed
+        self.assertEqual(paginator.count, 12)
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertTrue(is_paginated)
+
+
+class AuditTrailKeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_admin('admin', 'Admin User', 'admin@example.com', 'pass1234')
+        logs = AuditTrail.objects.bulk_create([
+            AuditTrail(action='UPDATE', model_name='Test', detail=str(i)) for i in range(45)
+        ])
+        # Pairs of rows share a timestamp so the id tie-breaker is exercised
+        for i, log in enumerate(logs):
+            AuditTrail.objects.filter(pk=log.pk).update(timestamp=local_time(2026, 1, 1, 0, i // 2))
+        cls.expected = list(AuditTrail.objects.order_by('-timestamp', '-id').values_list('pk', flat=True))
+
+    def page(self, query=''):
+        view = AuditTrailListView()
+        view.setup(RequestFactory().get(f'/audit-trail/{query}'))
+        view.request.user = self.admin
+        view.object_list = view.get_queryset()
+        context = view.get_context_data()
+        return [row.pk for row in context['entries']], context
+
+    def test_walks_older_and_back_newer(self):
+        first, context = self.page()
+        self.assertEqual(first, self.expected[:20])
+        self.assertNotIn('newer_url', context)
+
+        second, context = self.page(context['older_url'])
+        self.assertEqual(second, self.expected[20:40])
+
+        third, context = self.page(context['older_url'])
+        self.assertEqual(third, self.expected[40:])
+        self.assertNotIn('older_url', context)
+
+        back, context = self.page(context['newer_url'])
+        self.assertEqual(back, second)
+        back, context = self.page(context['newer_url'])
+        self.assertEqual(back, first)
+        self.assertNotIn('newer_url', context)
+        self.assertIn('latest_url', context)
+
+    def test_keeps_filters_in_links(self):
+        _, context = self.page('?tab=activity&action=UPDATE')
+        self.assertIn('action=UPDATE', context['older_url'])
+        self.assertIn('tab=activity', context['older_url'])
+
+    def test_ignores_malformed_cursor(self):
+        rows, _ = self.page('?older=garbage')
+        self.assertEqual(rows, self.expected[:20])
+
+
+class BudgetAllocationListTotalsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_admin('admin', 'Admin User', 'admin@example.com', 'pass1234')
+        budget = ApprovedBudget.objects.create(
+            title='Annual Budget 2026', fiscal_year='2026', amount=Decimal('100000.00')
+        )
+        for i in range(12):
+            user = User.objects.create_user(
+                f'user{i}', f'User {i}', f'user{i}@example.com', 'pass1234', department=f'Dept {i % 3}'
+            )
+            BudgetAllocation.objects.create(
+                approved_budget=budget, department=user.department, end_user=user,
+                allocated_amount=Decimal('1000.00'), remaining_balance=Decimal('750.00'),
+            )
+
+    def context(self, paginate_by):
+        view = BudgetAllocationListView()
+        view.setup(RequestFactory().get('/'))
+        view.request.user = self.admin
+        view.paginate_by = paginate_by
+        view.object_list = view.get_queryset()
+        return view.get_context_data()
+
+    def test_paginated_count_comes_from_totals(self):
+        context = self.context(10)
+        self.assertEqual(context['paginator'].count, 12)
+        self.assertEqual(context['paginator'].num_pages, 2)
+        self.assertEqual(context['total_allocated'], Decimal('12000.00'))
+        self.assertEqual(context['total_departments'], 3)
+        self.assertEqual(context['utilization_rate'], Decimal('25'))
+
+    def test_totals_without_pagination(self):
+        context = self.context(None)
+        self.assertIsNone(context['paginator'])
+        self.assertEqual(len(context['allocations']), 12)
+        self.assertEqual(context['total_remaining'], Decimal('9000.00'))
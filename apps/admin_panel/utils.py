@@ -1,6 +1,119 @@
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+from apps.user_accounts.models import User
 from .models import AuditTrail
+
+# Dashboard stats are cached per fiscal year. Keys embed a version number so a
+# single incr() invalidates every year at once (works on any cache backend).
+DASHBOARD_CACHE_TIMEOUT = 60
+DASHBOARD_CACHE_VERSION_KEY = 'admin_dash:version'
+# The recent activity feed is cached separately (all years share it) and is
+# dropped on every audit write, leaving the stats cache alone.
+RECENT_ACTIVITY_CACHE_KEY = 'admin_dash:recent_activity'
+RECENT_ACTIVITY_CACHE_TIMEOUT = 30
+
+# End-user dropdown options per MFO, versioned the same way so any user change
+# (including an MFO move) drops every cached list.
+USERS_BY_MFO_CACHE_TIMEOUT = 120
+USERS_BY_MFO_VERSION_KEY = 'users_by_mfo:version'
+
+# Distinct user departments / MFOs for the filter dropdowns
+USER_DEPARTMENTS_CACHE_KEY = 'user_departments'
+USER_MFOS_CACHE_KEY = 'user_mfos'
+USER_DEPARTMENTS_CACHE_TIMEOUT = 300
+
+# Bulk call sites (e.g. bulk user actions) insert their audit rows in batches
+AUDIT_BATCH_SIZE = 500
+
+
+def get_dashboard_cache_key(selected_year):
+    version = cache.get_or_set(DASHBOARD_CACHE_VERSION_KEY, 1, None)
+    return f'admin_dash:{version}:{selected_year}'
+
+
+def invalidate_dashboard_cache():
+    """Drop every cached dashboard context (all years)."""
+    try:
+        cache.incr(DASHBOARD_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(DASHBOARD_CACHE_VERSION_KEY, 1, None)
+
+
+def get_users_by_mfo_cache_key(mfo):
+    version = cache.get_or_set(USERS_BY_MFO_VERSION_KEY, 1, None)
+    return f'users_by_mfo:{version}:{mfo}'
+
+
+def invalidate_recent_activity_cache():
+    cache.delete(RECENT_ACTIVITY_CACHE_KEY)
+
+
+def get_user_departments():
+    return cache.get_or_set(
+        USER_DEPARTMENTS_CACHE_KEY,
+        lambda: list(User.objects.values_list('department', flat=True).distinct()),
+        USER_DEPARTMENTS_CACHE_TIMEOUT,
+    )
+
+
+def get_user_mfos():
+    return cache.get_or_set(
+        USER_MFOS_CACHE_KEY,
+        lambda: list(
+            User.objects.exclude(mfo__isnull=True).exclude(mfo='')
+            .values_list('mfo', flat=True).distinct()
+        ),
+        USER_DEPARTMENTS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_users_by_mfo_cache():
+    try:
+        cache.incr(USERS_BY_MFO_VERSION_KEY)
+    except ValueError:
+        cache.set(USERS_BY_MFO_VERSION_KEY, 1, None)
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Paginator for a list whose row count the view already has (e.g. from a
+    stats aggregate over the same queryset), so no separate COUNT(*) is run.
+    """
+
+    def __init__(self, *args, count, **kwargs):
+        self.known_count = count
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def count(self):
+        return self.known_count
+
+
+def invalidate_user_caches():
+    invalidate_users_by_mfo_cache()
+    cache.delete_many([USER_DEPARTMENTS_CACHE_KEY, USER_MFOS_CACHE_KEY])
+    invalidate_dashboard_cache()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users_by_mfo_on_user_change(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which neither the dropdowns nor the
+    # dashboard's user count depend on
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    transaction.on_commit(invalidate_user_caches)
+
+
 def log_activity(user, action, detail, model_name=None, record_id=None, request=None):
     ip = request.META.get('REMOTE_ADDR') if request else None
+    # Written on the caller's connection, so the row commits or rolls back
+    # together with the action it records
     AuditTrail.objects.create(
         user=user,
         action=action,
@@ -8,4 +121,5 @@ def log_activity(user, action, detail, model_name=None, record_id=None, request=
         model_name=model_name or '',
         record_id=record_id,
         ip_address=ip
-    )
\ No newline at end of file
+    )
+    transaction.on_commit(invalidate_recent_activity_cache)
@@ -1,10 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView, ListView, DetailView, View
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q, F, Value, DecimalField, ExpressionWrapper, Prefetch
+from django.db.models.functions import Concat, NullIf
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.core.cache import cache
 from django.utils.decorators import method_decorator
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 from apps.user_accounts.models import User
 from apps.budgets.models import (
     ApprovedBudget, 
@@ -15,24 +18,70 @@ from apps.budgets.models import (
     RequestApproval,
     SystemNotification,
     DepartmentPREApprovedDocument,
+    DepartmentPRESupportingDocument,
     PREBudgetRealignment,
     PRELineItem,
-    BudgetRealignmentSupportingDocument
+    BudgetRealignmentSupportingDocument,
+    SupportingDocument,
 )
 from django.contrib import messages
 from apps.admin_panel.models import AuditTrail
 from apps.budgets.models import ApprovedBudget, BudgetTransaction
 from apps.budgets.forms import ApprovedBudgetForm
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, Http404
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.clickjacking import xframe_options_exempt
 from .forms import BudgetAllocationForm, CustomUserCreationForm, CustomUserEditForm, ApprovedDocumentUploadForm
 import json
+from itertools import islice
 from django.views.decorators.http import require_POST
-from apps.admin_panel.utils import log_activity
+from apps.admin_panel.utils import (
+    log_activity,
+    get_dashboard_cache_key,
+    get_users_by_mfo_cache_key,
+    get_user_departments,
+    get_user_mfos,
+    invalidate_users_by_mfo_cache,
+    invalidate_dashboard_cache,
+    invalidate_recent_activity_cache,
+    KnownCountPaginator,
+    AUDIT_BATCH_SIZE,
+    DASHBOARD_CACHE_TIMEOUT,
+    RECENT_ACTIVITY_CACHE_KEY,
+    RECENT_ACTIVITY_CACHE_TIMEOUT,
+    USERS_BY_MFO_CACHE_TIMEOUT,
+)
 from django.db import transaction
-from apps.budgets.utils import log_budget_transaction
+from apps.budgets.utils import (
+    log_budget_transaction,
+    get_available_years,
+    get_archived_years,
+    get_pre_departments,
+    get_pr_departments,
+    get_ad_departments,
+    get_pr_years,
+)
+
+def date_range_q(field, date_from, date_to):
+    """
+    Inclusive local-date range on a datetime field, written as a plain
+    timestamp range (field >= start, field < day after end) instead of
+    CAST(field AS date) so the column's index stays usable. Unparseable
+    dates are ignored.
+    """
+    q = Q()
+    try:
+        if date_from:
+            start = datetime.combine(date.fromisoformat(date_from), time.min)
+            q &= Q(**{f'{field}__gte': timezone.make_aware(start)})
+        if date_to:
+            end = datetime.combine(date.fromisoformat(date_to) + timedelta(days=1), time.min)
+            q &= Q(**{f'{field}__lt': timezone.make_aware(end)})
+    except ValueError:
+        return Q()
+    return q
+
 
 class AdminDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     """Dashboard for Budget Officers/Admins"""
@@ -54,111 +103,159 @@ class AdminDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         context['selected_year'] = selected_year
         
         # Get available years for filter
-        available_years = ApprovedBudget.objects.values_list('fiscal_year', flat=True).distinct().order_by('-fiscal_year')
-        context['available_years'] = available_years
+        context['available_years'] = get_available_years()
+
+        # The aggregates below only change when budgets/requests are mutated,
+        # so serve them from cache and let the write paths invalidate.
+        context.update(cache.get_or_set(
+            get_dashboard_cache_key(selected_year),
+            lambda: self.get_dashboard_stats(selected_year),
+            DASHBOARD_CACHE_TIMEOUT,
+        ))
+        # The activity feed changes on nearly every request, so it has its own
+        # short-lived key and audit writes don't evict the stats above.
+        context['recent_activities'] = cache.get_or_set(
+            RECENT_ACTIVITY_CACHE_KEY,
+            self.get_recent_activities,
+            RECENT_ACTIVITY_CACHE_TIMEOUT,
+        )
+
+        return context
 
+    def get_dashboard_stats(self, selected_year):
+        """Build the cacheable (plain data) part of the dashboard context."""
+        stats = {}
+        
         # --- 1. User Stats ---
         # Count active end users (excluding superusers/staff if desired, or all active)
         end_users_total = User.objects.filter(is_active=True).count()
-        context['end_users_total'] = end_users_total
+        stats['end_users_total'] = end_users_total
         
         # Simple trend (mocked for now, or compare to last month if we tracked creation date)
         # Assuming 'up' for positive vibes
-        context['user_trend'] = 'up' 
+        stats['user_trend'] = 'up' 
 
         # --- 2. Budget Stats ---
         # Filter by selected year if not 'all'
-        budget_query = ApprovedBudget.objects.filter(is_active=True)
+        # The same query tells us whether the year has any budgets at all
+        budget_query = ApprovedBudget.objects.all()
         if selected_year != 'all':
             budget_query = budget_query.filter(fiscal_year=selected_year)
             
-        total_budget = budget_query.aggregate(total=Sum('amount'))['total'] or 0
-        context['total_budget'] = total_budget
-        context['budget_trend'] = 'up' # Placeholder
+        budget_totals = budget_query.aggregate(
+            total=Sum('amount', filter=Q(is_active=True)),
+            budgets=Count('id'),
+        )
+        total_budget = budget_totals['total'] or 0
+        stats['total_budget'] = total_budget
+        stats['budget_trend'] = 'up' # Placeholder
 
         # --- 3. Request Statuses (Pending vs Approved) ---
         # We look at all request types: PRE, PR, AD
         
+        # One conditional aggregate per model instead of a COUNT per status
+        status_counts = dict(
+            pending=Count('id', filter=Q(status='Pending')),
+            approved=Count('id', filter=Q(status='Approved')),
+        )
+        pre_counts = DepartmentPRE.objects.aggregate(**status_counts)
+        pr_counts = PurchaseRequest.objects.aggregate(**status_counts)
+        ad_counts = ActivityDesign.objects.aggregate(**status_counts)
+
         # Pending Counts
-        pending_pre = DepartmentPRE.objects.filter(status='Pending').count()
-        pending_pr = PurchaseRequest.objects.filter(status='Pending').count()
-        pending_ad = ActivityDesign.objects.filter(status='Pending').count()
-        
-        total_pending = pending_pre + pending_pr + pending_ad
-        context['total_pending_realignment_request'] = total_pending # Using legacy variable name
-        context['pending_trend'] = 'down' if total_pending < 5 else 'up'
+        total_pending = pre_counts['pending'] + pr_counts['pending'] + ad_counts['pending']
+        stats['total_pending_realignment_request'] = total_pending # Using legacy variable name
+        stats['pending_trend'] = 'down' if total_pending < 5 else 'up'
 
         # Approved Counts
-        approved_pre = DepartmentPRE.objects.filter(status='Approved').count()
-        approved_pr = PurchaseRequest.objects.filter(status='Approved').count()
-        approved_ad = ActivityDesign.objects.filter(status='Approved').count()
-        
-        total_approved = approved_pre + approved_pr + approved_ad
-        context['total_approved_realignment_request'] = total_approved # Using legacy variable name
-        context['approved_trend'] = 'up'
+        total_approved = pre_counts['approved'] + pr_counts['approved'] + ad_counts['approved']
+        stats['total_approved_realignment_request'] = total_approved # Using legacy variable name
+        stats['approved_trend'] = 'up'
 
         # --- 4. Department Metrics ---
         # Get allocations for the selected year (via ApprovedBudget linkage)
         allocations = BudgetAllocation.objects.all()
-        if selected_year != 'all':
+        if not budget_totals['budgets']:
+            # No budgets for this year (e.g. a future year), so no allocations either
+            allocations = allocations.none()
+        elif selected_year != 'all':
             allocations = allocations.filter(approved_budget__fiscal_year=selected_year)
             
-        # Group by department
+        # Group by department; utilization is computed in SQL (NULL when nothing allocated)
         dept_stats = allocations.values('department').annotate(
             total_allocated=Sum('allocated_amount'),
             spent=Sum('pr_amount_used') + Sum('ad_amount_used'),
             remaining_budget=Sum('remaining_balance')
+        ).annotate(
+            utilization=ExpressionWrapper(
+                (F('total_allocated') - F('remaining_budget')) * 100 / NullIf(F('total_allocated'), 0),
+                output_field=DecimalField(),
+            )
         ).order_by('-total_allocated')
         
-        context['budget_allocated'] = dept_stats # For the table
-        context['active_departments'] = dept_stats.count()
+        stats['budget_allocated'] = list(dept_stats) # For the table
+        stats['active_departments'] = len(stats['budget_allocated'])
         
-        # Calculate Low Budget Alerts (departments with < 10% remaining)
-        low_budget_count = 0
-        total_utilization = 0
-        dept_count = 0
+        # Low Budget Alerts (departments with < 10% remaining, i.e. > 90% utilized)
+        # and average utilization, reduced over the rows already fetched above
+        # rather than spending another round-trip re-aggregating them in SQL
+        utilizations = [d['utilization'] for d in stats['budget_allocated'] if d['utilization'] is not None]
+        stats['low_budget_depts'] = sum(1 for value in utilizations if value > 90)
+        stats['avg_utilization'] = round(sum(utilizations) / len(utilizations), 1) if utilizations else 0
         
-        # Prepare data for Chart.js
-        dept_labels = []
-        dept_allocated_data = []
-        dept_spent_data = []
-        dept_remaining_data = []
-        
-        for stat in dept_stats:
-            allocated = stat['total_allocated'] or 0
-            remaining = stat['remaining_budget'] or 0
-            
-            if allocated > 0:
-                percentage = (remaining / allocated) * 100
-                if percentage < 10:
-                    low_budget_count += 1
-                
-                utilization = ((allocated - remaining) / allocated) * 100
-                total_utilization += utilization
-                dept_count += 1
-            
-            # Chart Data (Top 10 departments to avoid overcrowding)
-            if len(dept_labels) < 10:
-                dept_labels.append(stat['department'])
-                dept_allocated_data.append(float(allocated))
-                dept_spent_data.append(float(stat['spent'] or 0))
-                dept_remaining_data.append(float(remaining))
-
-        context['low_budget_depts'] = low_budget_count
-        context['avg_utilization'] = round(total_utilization / dept_count, 1) if dept_count > 0 else 0
+        # Chart Data (Top 10 departments to avoid overcrowding). budget_allocated is
+        # already ordered by -total_allocated, so take the head instead of re-querying.
+        top_departments = [
+            (d['department'], d['total_allocated'], d['spent'], d['remaining_budget'])
+            for d in islice(stats['budget_allocated'], 10)
+        ]
+        labels, allocated, spent, remaining = zip(*top_departments) if top_departments else ((), (), (), ())
         
         # Pass JSON data for charts
-        context['dept_labels'] = dept_labels
-        context['dept_allocated'] = dept_allocated_data
-        context['dept_spent'] = dept_spent_data
-        context['dept_remaining'] = dept_remaining_data
+        stats['dept_labels'] = list(labels)
+        stats['dept_allocated'] = [float(value or 0) for value in allocated]
+        stats['dept_spent'] = [float(value or 0) for value in spent]
+        stats['dept_remaining'] = [float(value or 0) for value in remaining]
+
+        return stats
+
+    def get_recent_activities(self):
+        # Only the columns the activity feed renders, as plain dicts (cheaper to
+        # build and to pickle into the cache than model instances)
+        recent_activities = AuditTrail.objects.order_by('-timestamp').values(
+            'action', 'model_name', 'record_id', 'detail', 'timestamp',
+            'user_id', 'user__username', 'user__fullname',
+        )[:10]
+        return list(recent_activities)
+    
+def store_supporting_documents(budget, files):
+    """
+    Upload files to storage ahead of any row lock.
+    Returns unsaved SupportingDocument rows pointing at the stored names.
+    """
+    field = SupportingDocument._meta.get_field('document')
+    docs = []
+    try:
+        for f in files:
+            doc = SupportingDocument(approved_budget=budget, file_name=f.name, file_size=f.size)
+            doc.document = field.storage.save(
+                field.generate_filename(doc, f.name), f, max_length=field.max_length
+            )
+            # Metadata from the upload itself (document.size would hit storage)
+            doc.file_format = doc.document.name.split('.')[-1].lower()
+            docs.append(doc)
+    except Exception:
+        discard_supporting_documents(docs)
+        raise
+    return docs
+
+
+def discard_supporting_documents(docs):
+    """Remove stored files whose rows were never committed"""
+    for doc in docs:
+        doc.document.storage.delete(doc.document.name)
 
-        # --- 5. Recent Activity (Audit Trail) ---
-        recent_activities = AuditTrail.objects.select_related('user').order_by('-timestamp')[:10]
-        context['recent_activities'] = recent_activities
 
-        return context
-    
 class ApprovedBudgetListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = ApprovedBudget
     template_name = 'admin_panel/approved_budget.html'
@@ -171,10 +268,6 @@ class ApprovedBudgetListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        year = self.request.GET.get('summary_year')
-        if year and year != 'all':
-            queryset = queryset.filter(fiscal_year=year)
-            
         # GET Parameters from the URL
         # 'summary_year' is the Card Filter, 'fiscal_year' is from the filter Modal
         summary_year = self.request.GET.get('summary_year')
@@ -198,10 +291,7 @@ class ApprovedBudgetListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
             queryset = queryset.filter(amount__lte=amount_max)
             
         # Date Range
-        if date_from:
-            queryset = queryset.filter(created_at__date__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(created_at__date__lte=date_to)
+        queryset = queryset.filter(date_range_q('created_at', date_from, date_to))
         
         # Search (Title or Description)
         if search:
@@ -221,10 +311,16 @@ class ApprovedBudgetListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         
         # --- 2. Pass Summary Data ---
         # Calculate totals for the cards
-        queryset = self.get_queryset()
-        context['total_approved_budget'] = queryset.aggregate(Sum('amount'))['amount__sum'] or 0
-        context['total_remaining_budget'] = queryset.aggregate(Sum('remaining_budget'))['remaining_budget__sum'] or 0
-        context['total_budget_count'] = queryset.count()
+        # self.object_list is the filtered queryset ListView already built;
+        # one aggregate covers all three cards.
+        totals = self.object_list.aggregate(
+            total=Sum('amount'),
+            remaining=Sum('remaining_budget'),
+            count=Count('id'),
+        )
+        context['total_approved_budget'] = totals['total'] or 0
+        context['total_remaining_budget'] = totals['remaining'] or 0
+        context['total_budget_count'] = totals['count']
         
         # Calculate utilization (example logic)
         if context['total_approved_budget'] > 0:
@@ -235,7 +331,7 @@ class ApprovedBudgetListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
             
             
         # --- 3. Pass Filter Options ---
-        context['available_years'] = ApprovedBudget.objects.values_list('fiscal_year', flat=True).distinct().order_by('-fiscal_year')
+        context['available_years'] = get_available_years()
         context['selected_year'] = self.request.GET.get('summary_year', 'all')
         
         return context
@@ -246,54 +342,54 @@ class ApprovedBudgetListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         if action == 'edit':
             """Handle form submission for editing an existing budget"""
             budget_id = request.POST.get('budget_id')
-            budget = get_object_or_404(ApprovedBudget, pk=budget_id)
-            
+            new_docs = []
             try:
-                # Update Fields
-                budget.title = request.POST.get('title')
-                budget.fiscal_year = request.POST.get('fiscal_year')
+                # Upload NEW files (Append Them) before taking the lock; the upload
+                # path only needs the fiscal year being saved
+                files = request.FILES.getlist('supporting_documents')
+                new_docs = store_supporting_documents(
+                    ApprovedBudget(fiscal_year=request.POST.get('fiscal_year')), files
+                )
                 
-                #Handle amount carefully (check if it changed, might affect logic)
-                new_amount = request.POST.get('amount')
-                if new_amount:
-                    # Calculate difference if you track remaining budget logic
-                    # For now, simplistic update:
-                    budget.amount = new_amount
+                # Lock the row so concurrent edits (and allocation signals) serialize,
+                # and commit the budget together with its new documents.
+                with transaction.atomic():
+                    budget = get_object_or_404(ApprovedBudget.objects.select_for_update(), pk=budget_id)
+                    
+                    # Update Fields
+                    budget.title = request.POST.get('title')
+                    budget.fiscal_year = request.POST.get('fiscal_year')
                 
-                budget.description = request.POST.get('description')
-                budget.save()
+                    #Handle amount carefully (check if it changed, might affect logic)
+                    new_amount = request.POST.get('amount')
+                    if new_amount:
+                        # Calculate difference if you track remaining budget logic
+                        # For now, simplistic update:
+                        budget.amount = new_amount
                 
-                # Handle NEW files (Append Them)
-                files = request.FILES.getlist('supporting_documents')
-                from apps.budgets.models import SupportingDocument
+                    budget.description = request.POST.get('description')
+                    budget.save()
                 
-                uploaded_docs = []
-                try:
-                    for f in files:
-                        doc = SupportingDocument.objects.create(
-                            approved_budget=budget,
-                            document=f,
-                            uploaded_by=request.user,
-                            file_name=f.name
-                        )
-                        uploaded_docs.append(doc)
-                except Exception as upload_error:
-                    # If an upload fails, we don't rollback the whole budget edit, 
-                    # but we should probably delete the partially uploaded docs
-                    for doc in uploaded_docs:
-                        doc.delete()
-                    raise upload_error
+                    # One INSERT for all new documents
+                    for doc in new_docs:
+                        doc.approved_budget = budget
+                        doc.uploaded_by = request.user
+                    SupportingDocument.objects.bulk_create(new_docs, batch_size=100)
                     
-                log_activity(
-                    user=request.user,
-                    action='EDIT_APPROVED_BUDGET',
-                    detail=f'Edited Approved Budget ID {budget.id}',
-                    model_name='ApprovedBudget',
-                    record_id=budget.id
-                )
+                    log_activity(
+                        user=request.user,
+                        action='EDIT_APPROVED_BUDGET',
+                        detail=f'Edited Approved Budget ID {budget.id}',
+                        model_name='ApprovedBudget',
+                        record_id=budget.id
+                    )
                 
                 messages.success(request, 'Budget updated successfully!')
+            except Http404:
+                discard_supporting_documents(new_docs)
+                raise
             except Exception as e:
+                discard_supporting_documents(new_docs)
                 import traceback
                 traceback.print_exc()
                 messages.error(request, f'Error updating budget: {str(e)}')
@@ -311,40 +407,35 @@ class ApprovedBudgetListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
                         messages.error(request, "Supporting Documents: At least one file is required.")
                         return redirect('approved_budget')
 
-                    # 2. Save the Budget
                     budget = form.save(commit=False)
                     budget.created_by = request.user
                     budget.remaining_budget = budget.amount 
-                    budget.save()
                     
-                    # 3. Handle Multiple File Uploads
-                    from apps.budgets.models import SupportingDocument
+                    # 2. Upload the files before opening the transaction
+                    new_docs = store_supporting_documents(budget, files)
                     
-                    uploaded_docs = []
+                    # 3. Save the Budget and its documents atomically
                     try:
-                        for f in files:
-                            doc = SupportingDocument.objects.create(
-                                approved_budget=budget,
-                                document=f,
-                                uploaded_by=request.user,
-                                file_name=f.name, # Model auto-populates format/size in save()
-                                description="Initial supporting document"
+                        with transaction.atomic():
+                            budget.save()
+                            
+                            for doc in new_docs:
+                                doc.approved_budget = budget
+                                doc.uploaded_by = request.user
+                                doc.description = "Initial supporting document"
+                            SupportingDocument.objects.bulk_create(new_docs, batch_size=100)
+                            
+                            log_activity(
+                                user=request.user,
+                                action='CREATE_APPROVED_BUDGET',
+                                detail=f'Created Approved Budget ID {budget.id}',
+                                model_name='ApprovedBudget',
+                                record_id=budget.id
                             )
-                            uploaded_docs.append(doc)
-                    except Exception as upload_error:
-                        # Manual rollback if upload fails
-                        for doc in uploaded_docs:
-                            doc.delete()
-                        budget.delete()
-                        raise upload_error
-                        
-                    log_activity(
-                        user=request.user,
-                        action='CREATE_APPROVED_BUDGET',
-                        detail=f'Created Approved Budget ID {budget.id}',
-                        model_name='ApprovedBudget',
-                        record_id=budget.id
-                    )
+                    except Exception:
+                        # Nothing references the uploads once the rows roll back
+                        discard_supporting_documents(new_docs)
+                        raise
                     
                     messages.success(request, f'Approved Budget "{budget.title}" added successfully with {len(files)} document(s)!')
                     return redirect('approved_budget')
@@ -366,16 +457,27 @@ def approved_budget_detail(request, pk):
     """
     API endpoint to get budget details for modals
     """
-    budget = get_object_or_404(ApprovedBudget, pk=pk)
-    
-    # Get associated documents
-    documents = []
-    for doc in budget.supporting_documents.all():
-        documents.append({
-            'name': doc.file_name,
-            'url': doc.document.url,
-            'size': f"{doc.file_size / 1024:.2f} KB" if doc.file_size else "N/A",
-        })
+    budget = get_object_or_404(
+        ApprovedBudget.objects.select_related('created_by').only(
+            'id', 'title', 'description', 'fiscal_year', 'amount',
+            'remaining_budget', 'created_at', 'created_by__fullname',
+        ),
+        pk=pk,
+    )
+
+    # Get associated documents (plain rows, no model instances needed). The
+    # iterator skips the queryset's result cache, so only the JSON rows are held.
+    document_storage = SupportingDocument._meta.get_field('document').storage
+    documents = [
+        {
+            'name': doc['file_name'],
+            'url': document_storage.url(doc['document']),
+            'size': f"{doc['file_size'] / 1024:.2f} KB" if doc['file_size'] else "N/A",
+        }
+        for doc in budget.supporting_documents.values(
+            'file_name', 'document', 'file_size'
+        ).iterator(chunk_size=200)
+    ]
     
     data = {
         'id': budget.id,
@@ -384,7 +486,7 @@ def approved_budget_detail(request, pk):
         'fiscal_year': budget.fiscal_year,
         'amount': float(budget.amount),
         'remaining_budget': float(budget.remaining_budget),
-        'created_by': budget.created_by.get_full_name(),
+        'created_by': budget.created_by.get_full_name() if budget.created_by else "N/A",
         'created_at': budget.created_at.strftime('%Y-%m-%d %H:%M'),
         'documents': documents,
     }
@@ -419,35 +521,53 @@ class BudgetAllocationListView(ListView):
             queryset = queryset.filter(department__icontains=self.department)
             
         if self.search:
+            # User has a single fullname column (trigram-indexed on PostgreSQL)
             queryset = queryset.filter(
-                Q(end_user__first_name__icontains=self.search) |
-                Q(end_user__last_name__icontains=self.search) |
+                Q(end_user__fullname__icontains=self.search) |
                 Q(end_user__username__icontains=self.search)
             )
             
         return queryset
     
+    def get_totals(self):
+        """Statistics in one query over the filtered queryset"""
+        return self.object_list.aggregate(
+            total_allocated=Sum('allocated_amount'),
+            total_remaining=Sum('remaining_balance'),
+            total_departments=Count('department', distinct=True),
+            total_rows=Count('id'),
+        )
     
     def get_context_data(self, **kwargs):
+        # Computed before pagination so the paginator can reuse its row count
+        self.totals = totals = self.get_totals()
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
         
-        # Statistics
-        context['total_allocated'] = queryset.aggregate(Sum('allocated_amount'))['allocated_amount__sum'] or 0
-        context['total_remaining'] = queryset.aggregate(Sum('remaining_balance'))['remaining_balance__sum'] or 0
-        context['total_departments'] = queryset.values('department').distinct().count()
+        context['total_allocated'] = totals['total_allocated'] or 0
+        context['total_remaining'] = totals['total_remaining'] or 0
+        context['total_departments'] = totals['total_departments']
         
         total_used = context['total_allocated'] - context['total_remaining']
         context['utilization_rate'] = (total_used / context['total_allocated'] * 100) if context['total_allocated'] > 0 else 0
         
         # Dropdowns
-        context['available_years'] = ApprovedBudget.objects.values_list('fiscal_year', flat=True).distinct().order_by('-fiscal_year')
-        context['mfos'] = User.objects.values_list('mfo', flat=True).distinct().exclude(mfo__isnull=True).exclude(mfo='')
-        context['approved_budgets'] = ApprovedBudget.objects.filter(is_active=True, remaining_budget__gt=0)
+        context['available_years'] = get_available_years()
+        context['mfos'] = get_user_mfos()
+        # The create-modal dropdown only renders id/title/fiscal year/remaining
+        context['approved_budgets'] = ApprovedBudget.objects.filter(
+            is_active=True, remaining_budget__gt=0
+        ).only('id', 'title', 'fiscal_year', 'remaining_budget')
         
         context['selected_year'] = self.summary_year
         return context
     
+    def get_paginator(self, queryset, per_page, **kwargs):
+        # The stats aggregate counts the same rows, so skip the separate COUNT(*)
+        totals = getattr(self, 'totals', None)
+        if totals is None:
+            return super().get_paginator(queryset, per_page, **kwargs)
+        return KnownCountPaginator(queryset, per_page, count=totals['total_rows'], **kwargs)
+    
     def post(self, request, *args, **kwargs):
         """"Handle Create and Edit Actions"""
         action = request.POST.get('action')
@@ -466,25 +586,28 @@ class BudgetAllocationListView(ListView):
                 allocation.end_user = form.end_user
                 allocation.department = form.end_user.department
                 allocation.remaining_balance = allocation.allocated_amount
-                allocation.save()
-                # Parent ApprovedBudget remaining balance is synced by BudgetAllocation signals.
-                
-                log_activity(
-                    user=request.user,
-                    action='Budget Allocated',
-                    detail=f"Allocated {allocation.allocated_amount} to {allocation.end_user.get_full_name()}",
-                    model_name='BudgetAllocation',
-                    record_id=allocation.id
-                )
-                
-                log_budget_transaction(
-                    allocation=allocation,
-                    amount=allocation.allocated_amount, # Positive initial value
-                    transaction_type='Initial Allocation',
-                    user=request.user,
-                    remarks='Initial budget creation',
-                    update_allocation=False # Already saved above
-                )
+                # The allocation, the parent budget deduction, the ledger entry
+                # and the audit row commit together
+                with transaction.atomic():
+                    allocation.save()
+                    # Parent ApprovedBudget remaining balance is synced by BudgetAllocation signals.
+                    
+                    log_budget_transaction(
+                        allocation=allocation,
+                        amount=allocation.allocated_amount, # Positive initial value
+                        transaction_type='Initial Allocation',
+                        user=request.user,
+                        remarks='Initial budget creation',
+                        update_allocation=False # Already saved above
+                    )
+                    
+                    log_activity(
+                        user=request.user,
+                        action='Budget Allocated',
+                        detail=f"Allocated {allocation.allocated_amount} to {allocation.end_user.get_full_name()}",
+                        model_name='BudgetAllocation',
+                        record_id=allocation.id
+                    )
                 
                 messages.success(request, "Budget allocated successfully.")
             except Exception as e:
@@ -511,27 +634,36 @@ class BudgetAllocationListView(ListView):
                 # Delta is still useful for audit logging.
                 difference = new_amount - old_amount
 
-                # Save allocation with new amount
+                # Save allocation with new amount. Only the edited columns are written so
+                # a concurrent PR/AD approval's usage update isn't overwritten, and the
+                # remaining balance is recomputed from the live usage columns in SQL.
                 allocation = form.save(commit=False)
-                allocation.remaining_balance = new_amount - allocation.get_total_used()
-                allocation.save()
-                
-                log_activity(
-                    user=request.user,
-                    action='Budget Allocation Updated',
-                    detail=f"Updated {allocation.allocated_amount} to {allocation.end_user.get_full_name()}",
-                    model_name='BudgetAllocation',
-                    record_id=allocation.id
-                )
-                
-                log_budget_transaction(
-                    allocation=allocation,
-                    amount=difference, # Can be positive or negative
-                    transaction_type='Manual Adjustment',
-                    user=request.user,
-                    remarks='Admin edited budget amount',
-                    update_allocation=False # Allocation already saved above
-                )
+                with transaction.atomic():
+                    allocation.save(update_fields=['approved_budget', 'allocated_amount'])
+                    BudgetAllocation.all_objects.filter(pk=allocation.pk).update(
+                        remaining_balance=F('allocated_amount') - F('pr_amount_used') - F('ad_amount_used')
+                    )
+                    # update() skips post_save; drop the dashboard stats once it commits
+                    transaction.on_commit(invalidate_dashboard_cache)
+                    # The in-memory balance predates the UPDATE
+                    allocation.refresh_from_db(fields=['remaining_balance'])
+                    
+                    log_budget_transaction(
+                        allocation=allocation,
+                        amount=difference, # Can be positive or negative
+                        transaction_type='Manual Adjustment',
+                        user=request.user,
+                        remarks='Admin edited budget amount',
+                        update_allocation=False # Allocation already saved above
+                    )
+                    
+                    log_activity(
+                        user=request.user,
+                        action='Budget Allocation Updated',
+                        detail=f"Updated {allocation.allocated_amount} to {allocation.end_user.get_full_name()}",
+                        model_name='BudgetAllocation',
+                        record_id=allocation.id
+                    )
                 
                 messages.success(request, "Budget allocation updated successfully.")
             except Exception as e:
@@ -547,46 +679,63 @@ class BudgetAllocationListView(ListView):
 def get_users_by_mfo(request):
     """API: Get users for MFO dropdown"""
     mfo = request.GET.get('mfo')
-    users = User.objects.filter(mfo=mfo, is_active=True).values('id', 'fullname', 'department')
-    data = [{'id': u['id'], 'name': f"{u['fullname']} ({u['department']})"} for u in users]
+    
+    def build_options():
+        # The "Full Name (Department)" label is built by the database
+        return list(
+            User.objects.filter(mfo=mfo, is_active=True)
+            .annotate(name=Concat('fullname', Value(' ('), 'department', Value(')')))
+            .values('id', 'name')
+        )
+    
+    data = cache.get_or_set(get_users_by_mfo_cache_key(mfo), build_options, USERS_BY_MFO_CACHE_TIMEOUT)
     return JsonResponse({'users': data})
 @login_required
 def budget_allocation_detail(request, pk):
     """API: Get allocation details for modal"""
-    allocation = get_object_or_404(BudgetAllocation, pk=pk)
-    
-    # helper to safely get user attributes
-    user = allocation.end_user
+    # One joined row with exactly the fields the modal shows
+    allocation = get_object_or_404(
+        BudgetAllocation.objects.annotate(
+            total_used=F('pr_amount_used') + F('ad_amount_used'),
+        ).values(
+            'id', 'department', 'allocated_amount', 'remaining_balance',
+            'pre_amount_used', 'pr_amount_used', 'ad_amount_used', 'total_used', 'allocated_at',
+            'approved_budget__title', 'approved_budget__fiscal_year',
+            'approved_budget__amount', 'approved_budget__remaining_budget',
+            'end_user__fullname', 'end_user__username', 'end_user__email',
+            'end_user__mfo', 'end_user__position',
+        ),
+        pk=pk,
+    )
     
     data = {
-        'id': allocation.id,
+        'id': allocation['id'],
         # Approved Budget Info
-        'budget_title': allocation.approved_budget.title,
-        'fiscal_year': allocation.approved_budget.fiscal_year,
-        'approved_budget_total': float(allocation.approved_budget.amount),
-        'approved_budget_remaining': float(allocation.approved_budget.remaining_budget),
+        'budget_title': allocation['approved_budget__title'],
+        'fiscal_year': allocation['approved_budget__fiscal_year'],
+        'approved_budget_total': float(allocation['approved_budget__amount']),
+        'approved_budget_remaining': float(allocation['approved_budget__remaining_budget']),
         
         # User Info
-        'end_user_name': user.get_full_name(),
-        'username': user.username,
-        'email': user.email,
-        # Use getattr for custom fields if they might not exist or be empty
-        'mfo': getattr(user, 'mfo', 'N/A'), 
-        'department': allocation.department, # BudgetAllocation has its own department field
-        'position': getattr(user, 'position', 'N/A'),
+        'end_user_name': allocation['end_user__fullname'],
+        'username': allocation['end_user__username'],
+        'email': allocation['end_user__email'],
+        'mfo': allocation['end_user__mfo'],
+        'department': allocation['department'], # BudgetAllocation has its own department field
+        'position': allocation['end_user__position'],
         
         # Financials
-        'allocated_amount': float(allocation.allocated_amount),
-        'remaining_balance': float(allocation.remaining_balance),
+        'allocated_amount': float(allocation['allocated_amount']),
+        'remaining_balance': float(allocation['remaining_balance']),
         
-        # Usage breakdown
-        'pre_used': float(allocation.pre_amount_used),
-        'pr_used': float(allocation.pr_amount_used),
-        'ad_used': float(allocation.ad_amount_used),
-        'total_used': float(allocation.get_total_used()),
+        # Usage breakdown (total used is PR + AD, as in get_total_used)
+        'pre_used': float(allocation['pre_amount_used']),
+        'pr_used': float(allocation['pr_amount_used']),
+        'ad_used': float(allocation['ad_amount_used']),
+        'total_used': float(allocation['total_used']),
         
         # Meta
-        'allocated_at': allocation.allocated_at.strftime('%Y-%m-%d %H:%M'),
+        'allocated_at': allocation['allocated_at'].strftime('%Y-%m-%d %H:%M'),
     }
     
     return JsonResponse(data)
@@ -626,17 +775,21 @@ class ClientAccountsListView(ListView):
         return queryset
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset() # Current filtered
-        all_users = User.objects.filter(is_superuser=False, is_admin=False)
         
-        # Statistics
-        context['total_users'] = all_users.count()
-        context['active_users'] = all_users.filter(is_active=True).count()
-        context['inactive_users'] = all_users.filter(is_active=False).count()
-        context['end_user_count'] = all_users.filter(is_approving_officer=False).count()
+        # Statistics (unfiltered, one query)
+        stats = User.objects.filter(is_superuser=False, is_admin=False).aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+            inactive=Count('id', filter=Q(is_active=False)),
+            end_users=Count('id', filter=Q(is_approving_officer=False)),
+        )
+        context['total_users'] = stats['total']
+        context['active_users'] = stats['active']
+        context['inactive_users'] = stats['inactive']
+        context['end_user_count'] = stats['end_users']
         
         # Filters
-        context['departments'] = User.objects.values_list('department', flat=True).distinct()
+        context['departments'] = get_user_departments()
         
         return context
     def post(self, request, *args, **kwargs):
@@ -683,20 +836,16 @@ class ClientAccountsListView(ListView):
     
 @login_required
 def user_detail(request, pk):
-    user = get_object_or_404(User, pk=pk)
-    data = {
-        'id': user.id,
-        'fullname': user.fullname,
-        'username': user.username,
-        'email': user.email,
-        'department': user.department,
-        'mfo': user.mfo,
-        'position': user.position,
-        'is_active': user.is_active,
-        'is_approving_officer': user.is_approving_officer,
-        'created_at': user.created_at.strftime('%Y-%m-%d'),
-        'last_login': user.last_login.strftime('%Y-%m-%d %H:%M') if user.last_login else 'Never'
-    }
+    # Plain row with just the modal's fields (no password hash, no model instance)
+    data = get_object_or_404(
+        User.objects.values(
+            'id', 'fullname', 'username', 'email', 'department', 'mfo', 'position',
+            'is_active', 'is_approving_officer', 'created_at', 'last_login',
+        ),
+        pk=pk,
+    )
+    data['created_at'] = data['created_at'].strftime('%Y-%m-%d')
+    data['last_login'] = data['last_login'].strftime('%Y-%m-%d %H:%M') if data['last_login'] else 'Never'
     return JsonResponse(data)
 @login_required
 @require_POST
@@ -706,66 +855,111 @@ def toggle_user_status(request, pk):
     if user == request.user:
         return JsonResponse({'success': False, 'message': 'Cannot change your own status.'})
         
-    user.is_active = not user.is_active
-    user.save()
-    status = "activated" if user.is_active else "deactivated"
+    # Compare-and-set: flip only the value we read
+    new_status = not user.is_active
+    updated = User.objects.filter(pk=user.pk, is_active=user.is_active).update(is_active=new_status)
+    status = "activated" if new_status else "deactivated"
+    if not updated:
+        # Another admin changed it in the meantime; report the state it is in now
+        current = 'active' if User.objects.filter(pk=user.pk, is_active=True).exists() else 'inactive'
+        return JsonResponse({
+            'success': False,
+            'message': f"Another admin changed this user's status; the user is now {current}.",
+        }, status=409)
+    # update() skips post_save, so drop the caches that depend on is_active here
+    invalidate_users_by_mfo_cache()
+    invalidate_dashboard_cache()
     return JsonResponse({'success': True, 'message': f"User {status} successfully."})
+# A selection of user ids is tiny; anything bigger is not a real request
+BULK_USER_ACTION_MAX_BODY = 64 * 1024
+
 @login_required
 @require_POST
 def bulk_user_action(request):
+    # Check the declared size before Django reads the body into memory
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > BULK_USER_ACTION_MAX_BODY:
+        return JsonResponse({'success': False, 'message': 'Payload too large.'}, status=413)
+    
     try:
         data = json.loads(request.body)
         action = data.get('action')
-        user_ids = data.get('user_ids', [])
-        
-        if not user_ids:
-            return JsonResponse({'success': False, 'message': 'No users selected.'})
-            
-        users = User.objects.filter(id__in=user_ids)
-        
-        if action == 'activate':
-            users.update(is_active=True)
-            
-            log_activity(
-                user=request.user,
-                action='ACTIVATE_USER',
-                detail=f"Activated {users.count()} users",
-                model_name='User',
-                record_id=None,
-            )
-            
-            message = f"{users.count()} users activated."
-        elif action == 'deactivate':
-            # Prevent self-deactivation if ID in list
-            users.exclude(id=request.user.id).update(is_active=False)
-            
-            log_activity(
-                user=request.user,
-                action='DEACTIVATE_USER',
-                detail=f"Deactivated {users.count()} users",
-                model_name='User',
-                record_id=None,
-            )
-            
-            message = f"{users.count()} users deactivated."
-        else:
-            return JsonResponse({'success': False, 'message': 'Invalid action.'})
-            
-        return JsonResponse({'success': True, 'message': message})
-    except Exception as e:
-        return JsonResponse({'success': False, 'message': str(e)})
+        user_ids = [int(user_id) for user_id in data.get('user_ids', [])]
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'success': False, 'message': 'Invalid request data.'}, status=400)
+    
+    if not user_ids:
+        return JsonResponse({'success': False, 'message': 'No users selected.'})
+    if action not in ('activate', 'deactivate'):
+        return JsonResponse({'success': False, 'message': 'Invalid action.'})
+        
+    users = User.objects.filter(id__in=user_ids)
+    
+    if action == 'activate':
+        audit_action, verb, is_active = 'ACTIVATE_USER', 'Activated', True
+    else:
+        audit_action, verb, is_active = 'DEACTIVATE_USER', 'Deactivated', False
+        # Prevent self-deactivation if ID in list
+        users = users.exclude(id=request.user.id)
+    
+    # One UPDATE for the whole selection and one batched INSERT for the per-user
+    # audit rows, committed together. update() returns the number of rows
+    # changed, so no COUNT is needed.
+    ip = request.META.get('REMOTE_ADDR')
+    with transaction.atomic():
+        affected_ids = list(users.values_list('id', flat=True))
+        updated = User.objects.filter(id__in=affected_ids).update(is_active=is_active)
+        AuditTrail.objects.bulk_create(
+            [
+                AuditTrail(
+                    user=request.user,
+                    action=audit_action,
+                    detail=f"{verb} user ID {user_id}",
+                    model_name='User',
+                    record_id=user_id,
+                    ip_address=ip,
+                )
+                for user_id in affected_ids
+            ],
+            batch_size=AUDIT_BATCH_SIZE,
+        )
+    
+    message = f"{updated} users {verb.lower()}."
+    
+    # update() skips post_save, so drop the caches that depend on is_active here
+    invalidate_recent_activity_cache()
+    invalidate_users_by_mfo_cache()
+    invalidate_dashboard_cache()
+    return JsonResponse({'success': True, 'message': message})
     
     
 class AuditTrailListView(LoginRequiredMixin, ListView):
+    """
+    Keyset pagination on (-date, -id): ?older=<cursor> continues after the last
+    row shown and ?newer=<cursor> goes back before the first one, so deep pages
+    cost the same as the first and no COUNT(*) is run.
+    """
     template_name = 'admin_panel/audit_trail.html'
-    paginate_by = 20
-    context_object_name = 'page_obj'
+    context_object_name = 'entries'
+    page_size = 20
+
+    def get_date_field(self):
+        return 'created_at' if self.request.GET.get('tab', 'activity') == 'budget' else 'timestamp'
+
     def get_queryset(self):
         tab = self.request.GET.get('tab', 'activity')
         
         if tab == 'budget':
             # === BUDGET CHANGES TAB ===
-            queryset = BudgetTransaction.objects.select_related('allocation', 'allocation__end_user', 'created_by').all()
+            # The table only shows the allocation's department, so skip the
+            # end user / creator joins and fetch just the rendered columns
+            queryset = BudgetTransaction.objects.select_related('allocation').only(
+                'transaction_type', 'amount', 'previous_balance', 'new_balance',
+                'remarks', 'created_at', 'allocation', 'allocation__department',
+            )
             
             # Filter: Department
             dept = self.request.GET.get('department')
@@ -779,7 +973,11 @@ class AuditTrailListView(LoginRequiredMixin, ListView):
                 
         else:
             # === USER ACTIVITY TAB (Default) ===
-            queryset = AuditTrail.objects.select_related('user').all()
+            # The table shows every AuditTrail column, but only three user columns
+            queryset = AuditTrail.objects.select_related('user').only(
+                'action', 'model_name', 'record_id', 'detail', 'ip_address', 'timestamp',
+                'user', 'user__username', 'user__fullname', 'user__department',
+            )
             
             # Filter: Department (via User)
             dept = self.request.GET.get('department')
@@ -793,18 +991,75 @@ class AuditTrailListView(LoginRequiredMixin, ListView):
         # Common Filter: Date Range
         start_date = self.request.GET.get('start_date')
         end_date = self.request.GET.get('end_date')
-        if start_date:
-            queryset = queryset.filter(created_at__date__gte=start_date) if tab == 'budget' else queryset.filter(timestamp__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__date__lte=end_date) if tab == 'budget' else queryset.filter(timestamp__date__lte=end_date)
-            
-        return queryset
+        date_field = self.get_date_field()
+        return queryset.filter(date_range_q(date_field, start_date, end_date))
+
+    def parse_cursor(self, name):
+        """A cursor is '<iso timestamp>|<id>' of the row to page from"""
+        value, _, pk = self.request.GET.get(name, '').rpartition('|')
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            return None
+        if moment is None or not pk.isdigit():
+            return None
+        return moment, int(pk)
+
+    def make_cursor(self, row):
+        return f'{getattr(row, self.get_date_field()).isoformat()}|{row.pk}'
+
+    def page_url(self, name, row):
+        query = self.request.GET.copy()
+        for key in ('older', 'newer'):
+            query.pop(key, None)
+        if row is not None:
+            query[name] = self.make_cursor(row)
+        return f'?{query.urlencode()}'
+
+    def get_page(self):
+        """Return (rows, has_newer, has_older) for the requested cursor"""
+        date_field = self.get_date_field()
+        queryset = self.object_list
+        newer = self.parse_cursor('newer')
+        older = None if newer else self.parse_cursor('older')
+
+        if newer:
+            # Walk forward in time from the cursor, then flip back to newest-first.
+            # id breaks ties so rows sharing a timestamp are neither skipped nor repeated
+            moment, pk = newer
+            rows = list(queryset.filter(
+                Q(**{f'{date_field}__gt': moment}) | Q(**{date_field: moment, 'id__gt': pk})
+            ).order_by(date_field, 'id')[:self.page_size + 1])
+            has_newer = len(rows) > self.page_size
+            return rows[:self.page_size][::-1], has_newer, True
+
+        queryset = queryset.order_by(f'-{date_field}', '-id')
+        if older:
+            moment, pk = older
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__lt': moment}) | Q(**{date_field: moment, 'id__lt': pk})
+            )
+        # One extra row tells whether an older page exists
+        rows = list(queryset[:self.page_size + 1])
+        return rows[:self.page_size], older is not None, len(rows) > self.page_size
+
     def get_context_data(self, **kwargs):
+        rows, has_newer, has_older = self.get_page()
+        kwargs['object_list'] = rows
         context = super().get_context_data(**kwargs)
         context['active_tab'] = self.request.GET.get('tab', 'activity')
+
+        # Pagination links; "Latest" is offered whenever a cursor is in use
+        is_first_page = not (self.request.GET.get('older') or self.request.GET.get('newer'))
+        if has_newer:
+            context['newer_url'] = self.page_url('newer', rows[0] if rows else None)
+        if has_older and rows:
+            context['older_url'] = self.page_url('older', rows[-1])
+        if not is_first_page:
+            context['latest_url'] = self.page_url('older', None)
         
         # Context for filters
-        context['departments'] = User.objects.values_list('department', flat=True).distinct()
+        context['departments'] = get_user_departments()
         
         if context['active_tab'] == 'activity':
             context['action_choices'] = AuditTrail.ACTION_CHOICES
@@ -814,6 +1069,23 @@ class AuditTrailListView(LoginRequiredMixin, ListView):
         return context
     
     
+def pre_search_q(search_query):
+    """
+    Search filter shared by the admin PRE list and its PDF export.
+
+    IDs are displayed as "PRE-1A2B3C4D", so the pasted prefix is matched against
+    the lowercase UUID text (served by pre_id_text_prefix_idx). Submitter
+    fullname/username each have an UPPER() trigram index on PostgreSQL, which
+    the planner can combine with a BitmapOr.
+    """
+    id_prefix = search_query.strip().lower().removeprefix('pre-')
+    return (
+        Q(id__startswith=id_prefix) |
+        Q(submitted_by__fullname__icontains=search_query) |
+        Q(submitted_by__username__icontains=search_query)
+    )
+
+
 class PRERequestListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = DepartmentPRE
     template_name = 'admin_panel/pre_list.html'
@@ -827,6 +1099,13 @@ class PRERequestListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
             'submitted_by', 
             'budget_allocation',
             'budget_allocation__approved_budget'
+        ).only(
+            # Just what the list rows render; FK columns stay loaded for the joins
+            'id', 'status', 'department', 'created_at', 'submitted_at',
+            'uploaded_excel_file', 'submitted_by', 'budget_allocation',
+            'submitted_by__fullname', 'submitted_by__username',
+            'budget_allocation__approved_budget',
+            'budget_allocation__approved_budget__fiscal_year',
         )
         # --- Filtering ---
         search_query = self.request.GET.get('search', '')
@@ -836,38 +1115,28 @@ class PRERequestListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         date_to = self.request.GET.get('date_to', '')
         # Search (ID prefix or Submitter Name)
         if search_query:
-            queryset = queryset.filter(
-                Q(id__icontains=search_query) |
-                Q(submitted_by__first_name__icontains=search_query) |
-                Q(submitted_by__last_name__icontains=search_query) |
-                Q(submitted_by__username__icontains=search_query)
-            )
+            queryset = queryset.filter(pre_search_q(search_query))
         if department:
             queryset = queryset.filter(department=department)
         if status:
             queryset = queryset.filter(status=status)
-        if date_from:
-            queryset = queryset.filter(submitted_at__date__gte=date_from)
-        
-        if date_to:
-            queryset = queryset.filter(submitted_at__date__lte=date_to)
+        queryset = queryset.filter(date_range_q('submitted_at', date_from, date_to))
         return queryset
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         # --- Stats Counters ---
-        # We calculate these on the FULL dataset, not just the filtered page
-        all_pres = DepartmentPRE.objects.all()
-        
-        context['stats'] = {
-            'total': all_pres.exclude(status='Draft').count(),
-            'pending': all_pres.filter(status='Pending').count(),
-            'approved': all_pres.filter(status='Approved').count(),
-            'rejected': all_pres.filter(status='Rejected').count(),
-        }
+        # We calculate these on the FULL dataset, not just the filtered page,
+        # in one conditional-count pass
+        context['stats'] = DepartmentPRE.objects.aggregate(
+            total=Count('id', filter=~Q(status='Draft')),
+            pending=Count('id', filter=Q(status='Pending')),
+            approved=Count('id', filter=Q(status='Approved')),
+            rejected=Count('id', filter=Q(status='Rejected')),
+        )
         # --- Filter Options ---
         # Get distinct departments from existing PREs (since DeptStation model doesn't exist)
-        context['departments'] = DepartmentPRE.objects.values_list('department', flat=True).distinct().order_by('department')
+        context['departments'] = get_pre_departments()
         
         # Status choices from model
         context['status_choices'] = DepartmentPRE.STATUS_CHOICES
@@ -887,9 +1156,13 @@ class PREDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             'budget_allocation__approved_budget', 
             'submitted_by'
         ).prefetch_related(
-            'line_items__category',
-            'line_items__subcategory',
-            'supporting_documents',
+            # Category/subcategory ride along in the line items query
+            Prefetch('line_items', queryset=PRELineItem.objects.select_related('category', 'subcategory')),
+            # Ordered in the prefetch so the template list doesn't re-query
+            Prefetch(
+                'supporting_documents',
+                queryset=DepartmentPRESupportingDocument.objects.order_by('-uploaded_at'),
+            ),
             'signed_approved_documents'
         )
     def get_context_data(self, **kwargs):
@@ -913,38 +1186,28 @@ class PREDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
         # 2. Supporting Documents
         # If created in previous migration, fetch them
         if hasattr(pre, 'supporting_documents'):
-            context['supporting_documents'] = pre.supporting_documents.all().order_by('-uploaded_at')
+            context['supporting_documents'] = pre.supporting_documents.all()
         # 3. Budget Tracking Breakdown (The Complex Part)
-        # Calculates consumption for PRs and ADs per quarter
-        line_items_with_breakdown = []
-        
-        # Iterate over all line items
-        for item in pre.line_items.all():
-            item_data = {
-                'item': item,
-                'quarters': []
-            }
-            # Generate breakdown for each quarter
-            # This relies on item.get_quarter_breakdown() method on PRELineItem model
-            for quarter in ['Q1', 'Q2', 'Q3', 'Q4']:
-                if hasattr(item, 'get_quarter_breakdown'):
-                    breakdown = item.get_quarter_breakdown(quarter)
-                    item_data['quarters'].append(breakdown)
+        # Calculates consumption for PRs and ADs per quarter. Quarter usage for
+        # every line item is fetched in one grouped pass and hung on the item.
+        line_items = list(pre.line_items.all())
+        breakdowns = PRELineItem.bulk_quarter_breakdown(line_items)
+        for item in line_items:
+            item.quarter_breakdown = breakdowns[item.id]
             
-            line_items_with_breakdown.append(item_data)
-            
-        context['line_items_with_breakdown'] = line_items_with_breakdown
+        context['line_items'] = line_items
         
         return context
     
     
 @login_required
 @user_passes_test(lambda u: u.is_staff)
+@transaction.atomic
 def admin_handle_pre_action(request, pre_id):
     if request.method != 'POST':
         return redirect('admin_pre_list')
     
-    pre = get_object_or_404(DepartmentPRE, id=pre_id)
+    pre = get_object_or_404(DepartmentPRE.objects.select_for_update(), id=pre_id)
     action = request.POST.get('action')
     department_name = pre.department  # Store for message
     
@@ -952,7 +1215,7 @@ def admin_handle_pre_action(request, pre_id):
         if pre.status == 'Pending':
             pre.status = 'Partially Approved'
             pre.partially_approved_at = timezone.now()
-            pre.save()
+            pre.save(update_fields=['status', 'partially_approved_at', 'updated_at'])
             
             # Create Approval Record
             RequestApproval.objects.create(
@@ -989,7 +1252,7 @@ def admin_handle_pre_action(request, pre_id):
             reason = request.POST.get('reason', 'No reason provided')
             pre.status = 'Rejected'
             pre.rejection_reason = reason
-            pre.save()
+            pre.save(update_fields=['status', 'rejection_reason', 'updated_at'])
             
             # Create Rejection Record
             RequestApproval.objects.create(
@@ -1026,10 +1289,11 @@ def admin_handle_pre_action(request, pre_id):
 
 @login_required
 @user_passes_test(lambda u: u.is_staff)
+@transaction.atomic
 def admin_verify_and_approve_pre(request, pre_id):
     if request.method != 'POST':
         return redirect('admin_pre_detail', pk=pre_id)
-    pre = get_object_or_404(DepartmentPRE, id=pre_id)
+    pre = get_object_or_404(DepartmentPRE.objects.select_for_update(), id=pre_id)
     action = request.POST.get('action')
     comment = request.POST.get('reason', '') # Reuse 'reason' field for rejection comments
     if pre.status != 'Awaiting Admin Verification':
@@ -1040,7 +1304,7 @@ def admin_verify_and_approve_pre(request, pre_id):
         pre.awaiting_verification = False
         pre.final_approved_at = timezone.now() # Use appropriate timestamp field
         pre.admin_notes = comment
-        pre.save()
+        pre.save(update_fields=['status', 'awaiting_verification', 'final_approved_at', 'admin_notes', 'updated_at'])
         # Update budget consumption (Crucial!)
         if pre.budget_allocation:
             # Assuming budget_allocation has logic to update balances
@@ -1085,7 +1349,7 @@ def admin_verify_and_approve_pre(request, pre_id):
         pre.status = 'Partially Approved'
         pre.awaiting_verification = False
         pre.rejection_reason = comment
-        pre.save()
+        pre.save(update_fields=['status', 'awaiting_verification', 'rejection_reason', 'updated_at'])
         
         # Ideally, delete the invalid documents here if you have a relation to them
         # pre.signed_documents.all().delete()
@@ -1126,26 +1390,43 @@ def admin_upload_approved_document(request, pre_id):
         # Simply handling file manually for simplicity, or use a Form
         if 'approved_document' in request.FILES:
             file = request.FILES['approved_document']
-            pre.approved_documents = file # Adjust field name to match your model
-            pre.status = 'Approved'
-            pre.final_approved_at = timezone.now()
-            pre.save()
-            
-            RequestApproval.objects.create(
-                content_type='pre',
-                object_id=pre.id,
-                approved_by=request.user,
-                approval_level='final',
-                comments='Admin manually uploaded signed document.'
+            # Push the file to storage first so the row lock below isn't held
+            # across the network upload
+            field = pre.approved_documents.field
+            stored_name = field.storage.save(
+                field.generate_filename(pre, file.name), file, max_length=field.max_length
             )
             
-            log_activity(
-                user=request.user,
-                action='MANUALLY_UPLOADED',
-                detail=f'Admin manually uploaded signed document for PRE {str(pre.id)[:8]}',
-                model_name='DepartmentPRE',
-                record_id=pre.id
-            )
+            with transaction.atomic():
+                pre = get_object_or_404(DepartmentPRE.objects.select_for_update(), id=pre_id)
+                # Another admin may have acted on the PRE while the file uploaded
+                can_approve = pre.status == 'Partially Approved'
+                if can_approve:
+                    pre.approved_documents.name = stored_name
+                    pre.status = 'Approved'
+                    pre.final_approved_at = timezone.now()
+                    pre.save(update_fields=['approved_documents', 'status', 'final_approved_at', 'updated_at'])
+                    
+                    RequestApproval.objects.create(
+                        content_type='pre',
+                        object_id=pre.id,
+                        approved_by=request.user,
+                        approval_level='final',
+                        comments='Admin manually uploaded signed document.'
+                    )
+                    
+                    log_activity(
+                        user=request.user,
+                        action='MANUALLY_UPLOADED',
+                        detail=f'Admin manually uploaded signed document for PRE {str(pre.id)[:8]}',
+                        model_name='DepartmentPRE',
+                        record_id=pre.id
+                    )
+            
+            if not can_approve:
+                field.storage.delete(stored_name)
+                messages.error(request, f'This PRE is now {pre.status}; the document was not attached.')
+                return redirect('admin_pre_detail', pk=pre.id)
             
             messages.success(request, 'Document uploaded and PRE fully approved.')
             return redirect('admin_pre_detail', pk=pre.id)
@@ -1154,98 +1435,6 @@ def admin_upload_approved_document(request, pre_id):
             
     return render(request, 'admin_panel/upload_approved_doc.html', {'pre': pre})
 
-# class AdminPRListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
-#     model = PurchaseRequest
-#     template_name = 'admin_panel/pr_list.html'
-#     context_object_name = 'purchase_requests'
-#     paginate_by = 20 # Optional but recommended
-    
-#     def test_func(self):
-#         return self.request.user.is_superuser or self.request.user.is_staff # Adjust permission logic
-#     def get_queryset(self):
-#         queryset = PurchaseRequest.objects.select_related('submitted_by', 'department').all().order_by('-created_at')
-        
-#         # 1. Year Filter (Default to current year or 'all'?)
-#         year = self.request.GET.get('summary_year')
-#         if year and year != 'all':
-#             queryset = queryset.filter(created_at__year=year)
-            
-#         # 2. Department Filter
-#         dept = self.request.GET.get('department')
-#         if dept:
-#             queryset = queryset.filter(department__name=dept) # Assuming dept name passed
-            
-#         # 3. Status Filter
-#         status = self.request.GET.get('status')
-#         if status:
-#             queryset = queryset.filter(status=status)
-            
-#         return queryset
-#     def get_context_data(self, **kwargs):
-#         context = super().get_context_data(**kwargs)
-        
-#         # Base Queryset for Stats (Separate from pagination, but usually respects Year filter)
-#         stats_qs = PurchaseRequest.objects.all()
-#         year = self.request.GET.get('summary_year')
-#         if year and year != 'all':
-#             stats_qs = stats_qs.filter(created_at__year=year)
-            
-#         # Aggregation
-#         stats = stats_qs.aggregate(
-#             total=Count('id'),
-#             pending=Count('id', filter=Q(status='Pending')),
-#             partially_approved=Count('id', filter=Q(status='Partially Approved')),
-#             approved=Count('id', filter=Q(status='Approved')),
-#             rejected=Count('id', filter=Q(status='Rejected')),
-#         )
-#         context['status_counts'] = stats
-        
-#         # Filters Data
-#         context['available_years'] = PurchaseRequest.objects.dates('created_at', 'year').distinct()
-        
-#         # If Department is a CharField, get distinct values:
-#         context['departments'] = PurchaseRequest.objects.values_list('department', flat=True).distinct().order_by('department') 
-#         # OR if you have a Department model, use Department.objects.all()
-        
-#         context['selected_year'] = year if year else 'all'
-#         context['current_year'] = timezone.now().year
-#         context['status_choices'] = PurchaseRequest.STATUS_CHOICES # Ensure this exists in Model
-        
-#         return context
-    
-# @require_POST
-# def handle_pr_action(request, pr_id):
-#     pr = get_object_or_404(PurchaseRequest, id=pr_id)
-#     action = request.POST.get('action')
-    
-#     if action == 'approve':
-#         # Logic for Approval
-#         # 1. Check if status is valid for approval
-#         if pr.status == 'Pending':
-#             # Initial Approval -> Move to 'Partially Approved' to allow User to upload signed docs
-#             pr.status = 'Partially Approved'
-#             pr.save()
-#             messages.success(request, f"PR {pr.pr_number} successfully approved! It is now 'Partially Approved' and awaiting user signature.")
-        
-#         elif pr.status == 'Awaiting Admin Verification':
-#              # Final Approval -> Move to 'Approved'
-#             pr.status = 'Approved'
-#             pr.save()
-#             messages.success(request, f"PR {pr.pr_number} has been fully APPROVED.")
-            
-#         else:
-#              messages.warning(request, f"PR {pr.pr_number} cannot be approved from its current status: {pr.status}")
-#     elif action == 'reject':
-#         # Logic for Rejection
-#         # Deduct/Release budget is handled automatically because 'Rejected' status 
-#         # is excluded from the 'total_used' aggregation in reports/views.
-#         pr.status = 'Rejected'
-#         pr.save()
-#         messages.error(request, f"PR {pr.pr_number} has been rejected.")
-        
-#     return redirect('admin_pr_list')
-
-
 # class BudgetAllocationListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
 #     model = BudgetAllocation
 #     template_name = 'admin_panel/budget_allocation.html'
@@ -1317,9 +1506,14 @@ class AdminPRListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     def test_func(self):
         return self.request.user.is_superuser or self.request.user.is_staff
 
+
     def get_queryset(self):
         # FIX: Removed 'department' from select_related as it is a CharField
-        queryset = PurchaseRequest.objects.select_related('submitted_by').all().order_by('-created_at')
+        queryset = PurchaseRequest.objects.select_related('submitted_by').only(
+            # Just what the list rows render; the FK column stays loaded for the join
+            'id', 'department', 'status', 'purpose', 'created_at', 'submitted_by',
+            'submitted_by__fullname', 'submitted_by__email',
+        ).order_by('-created_at')
         
         # 1. Year Filter
         year = self.request.GET.get('summary_year')
@@ -1358,10 +1552,10 @@ class AdminPRListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         context['status_counts'] = stats
         
         # Filters Data
-        context['available_years'] = PurchaseRequest.objects.dates('created_at', 'year').distinct()
+        context['available_years'] = get_pr_years()
         
         # Get distinct department names
-        context['departments'] = PurchaseRequest.objects.values_list('department', flat=True).distinct().order_by('department') 
+        context['departments'] = get_pr_departments()
         
         context['selected_year'] = year if year else 'all'
         context['current_year'] = timezone.now().year
@@ -1370,15 +1564,17 @@ class AdminPRListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         return context
 
 @require_POST
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.is_staff)
 @transaction.atomic
 def handle_pr_action(request, pr_id):
-    pr = PurchaseRequest.objects.select_for_update().get(id=pr_id)
+    pr = get_object_or_404(PurchaseRequest.objects.select_for_update(), id=pr_id)
     action = request.POST.get('action')
     
     if action == 'approve':
         if pr.status == 'Pending':
             pr.status = 'Partially Approved'
-            pr.save()
+            pr.save(update_fields=['status', 'updated_at'])
             
             log_activity(
                 user=request.user,
@@ -1408,7 +1604,7 @@ def handle_pr_action(request, pr_id):
 
     elif action == 'reject':
         pr.status = 'Rejected'
-        pr.save()
+        pr.save(update_fields=['status', 'updated_at'])
         
         log_activity(
             user=request.user,
@@ -1461,18 +1657,14 @@ class AdminPRDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     
 @require_POST
 @login_required
+@user_passes_test(lambda u: u.is_superuser or u.is_staff)
 @transaction.atomic
 def admin_verify_and_approve_pr(request, pr_id):
     """
     Handles the 'Verify & Approve' or 'Reject Verification' actions 
     for PRs in the 'Awaiting Admin Verification' state.
     """
-    pr = PurchaseRequest.objects.select_for_update().get(id=pr_id)
-    
-    # Security Check
-    if not (request.user.is_superuser or request.user.is_staff):
-        messages.error(request, "Unauthorized access.")
-        return redirect('admin_pr_list')
+    pr = get_object_or_404(PurchaseRequest.objects.select_for_update(), id=pr_id)
     action = request.POST.get('action')
     comment = request.POST.get('comment', '')
     
@@ -1486,10 +1678,8 @@ def admin_verify_and_approve_pr(request, pr_id):
         # Store optional notes if you have a field for it, e.g. 'admin_notes'
         # pr.admin_notes = comment 
         
-        pr.save()
-        
-        # Update Budget Allocation Usage
-        pr.update_budget_usage()
+        # save() also re-syncs the allocation's PR usage and remaining balance
+        pr.save(update_fields=['status', 'final_approved_at', 'admin_approved_by', 'updated_at'])
         
         log_activity(
             user=request.user,
@@ -1505,7 +1695,7 @@ def admin_verify_and_approve_pr(request, pr_id):
             transaction_type='Expense - PR',
             user=request.user,
             remarks=f'Approved PR-{pr.pr_number}',
-            update_allocation=False # Usage is already updated by pr.update_budget_usage()
+            update_allocation=False # Usage is already updated by pr.save()
         )
         
         messages.success(request, f"PR {pr.pr_number} has been verified and fully APPROVED.")
@@ -1518,7 +1708,7 @@ def admin_verify_and_approve_pr(request, pr_id):
         
         pr.status = 'Partially Approved' 
         # pr.admin_notes = f"Verification Rejected: {reason}" # Optional
-        pr.save()
+        pr.save(update_fields=['status', 'updated_at'])
         
         log_activity(
             user=request.user,
@@ -1561,7 +1751,7 @@ class DepartmentADRequestView(LoginRequiredMixin, UserPassesTestMixin, ListView)
         context = super().get_context_data(**kwargs)
         
         # 1. Year Filter Data
-        context['available_years'] = ApprovedBudget.objects.values_list('fiscal_year', flat=True).distinct().order_by('-fiscal_year')
+        context['available_years'] = get_available_years()
         context['selected_year'] = self.request.GET.get('summary_year', 'all')
         context['current_year'] = timezone.now().year
         
@@ -1582,7 +1772,7 @@ class DepartmentADRequestView(LoginRequiredMixin, UserPassesTestMixin, ListView)
         )
         
         # 3. Filter Options
-        context['departments'] = ActivityDesign.objects.values_list('department', flat=True).distinct().order_by('department')
+        context['departments'] = get_ad_departments()
         context['status_choices'] = ActivityDesign.STATUS_CHOICES
         
         return context
@@ -1762,14 +1952,13 @@ class AdminPREBudgetRealignmentListView(LoginRequiredMixin, UserPassesTestMixin,
         return qs
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        all_requests = PREBudgetRealignment.objects.all()
-        context['status_counts'] = {
-            'total': all_requests.count(),
-            'pending': all_requests.filter(status='Pending').count(),
-            'approved': all_requests.filter(status='Approved').count(),
-            'partially_approved': all_requests.filter(status='Partially Approved').count(),
-            'rejected': all_requests.filter(status='Rejected').count(),
-        }
+        context['status_counts'] = PREBudgetRealignment.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='Pending')),
+            approved=Count('id', filter=Q(status='Approved')),
+            partially_approved=Count('id', filter=Q(status='Partially Approved')),
+            rejected=Count('id', filter=Q(status='Rejected')),
+        )
         context['status_choices'] = PREBudgetRealignment.STATUS_CHOICES
         context['status_filter'] = self.request.GET.get('status', '')
         return context
@@ -1864,8 +2053,8 @@ def handle_admin_realignment_action(request, pk):
                         raise ValueError("\n".join(validation_errors))
                     # 3. Handle Uploaded Approved Documents
                     uploaded_docs = request.FILES.getlist('approved_documents')
-                    for doc in uploaded_docs:
-                        BudgetRealignmentSupportingDocument.objects.create(
+                    BudgetRealignmentSupportingDocument.objects.bulk_create([
+                        BudgetRealignmentSupportingDocument(
                             budget_realignment=realignment,
                             document=doc,
                             file_name=doc.name,
@@ -1873,6 +2062,8 @@ def handle_admin_realignment_action(request, pk):
                             uploaded_by=request.user,
                             is_signed_copy=True
                         )
+                        for doc in uploaded_docs
+                    ], batch_size=100)
                     # 4. Execute Budget Transfer
                     # Deduct from Source
                     if realignment.q1_amount: source_item.q1_amount -= realignment.q1_amount
@@ -1966,10 +2157,15 @@ def export_approved_budget_report_pdf(request):
     if selected_year and selected_year != 'all':
         budgets = budgets.filter(fiscal_year=selected_year)
         
-    # 3. Calculate Summaries
-    total_approved = budgets.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    total_remaining = budgets.aggregate(total=Sum('remaining_budget'))['total'] or Decimal('0')
-    total_entries = budgets.count()
+    # 3. Calculate Summaries (single query)
+    totals = budgets.aggregate(
+        total_approved=Sum('amount'),
+        total_remaining=Sum('remaining_budget'),
+        total_entries=Count('id'),
+    )
+    total_approved = totals['total_approved'] or Decimal('0')
+    total_remaining = totals['total_remaining'] or Decimal('0')
+    total_entries = totals['total_entries']
     
     utilization_rate = Decimal('0')
     if total_approved > 0:
@@ -1982,7 +2178,11 @@ def export_approved_budget_report_pdf(request):
         'generated_by': request.user.get_full_name(),
         'date_generated': datetime.now(),
         'fiscal_year': selected_year,
-        'budgets': budgets,
+        # Only the report columns, fetched from the DB in chunks rather than
+        # filling the queryset result cache in one go
+        'budgets': budgets.only(
+            'title', 'fiscal_year', 'amount', 'remaining_budget', 'created_at'
+        ).iterator(chunk_size=2000),
         'total_approved': total_approved,
         'total_remaining': total_remaining,
         'utilization_rate': utilization_rate,
@@ -2022,14 +2222,17 @@ def export_budget_allocation_report_pdf(request):
     if selected_year and selected_year != 'all':
         allocations = allocations.filter(approved_budget__fiscal_year=selected_year)
         
-    # 3. Calculate Summaries
-    total_allocated = allocations.aggregate(total=Sum('allocated_amount'))['total'] or Decimal('0')
-    total_remaining = allocations.aggregate(total=Sum('remaining_balance'))['total'] or Decimal('0')
-    
-    # Calculate Total Used (iterating since it includes PR + AD logic inside model method)
-    # Using sum() on queryset for method calculation might be slow for huge datasets but fine for report
-    total_used = sum(a.get_total_used() for a in allocations)
-    total_entries = allocations.count()
+    # 3. Calculate Summaries (single query; total used = PR + AD usage columns)
+    totals = allocations.aggregate(
+        total_allocated=Sum('allocated_amount'),
+        total_remaining=Sum('remaining_balance'),
+        total_used=Sum(F('pr_amount_used') + F('ad_amount_used')),
+        total_entries=Count('id'),
+    )
+    total_allocated = totals['total_allocated'] or Decimal('0')
+    total_remaining = totals['total_remaining'] or Decimal('0')
+    total_used = totals['total_used'] or Decimal('0')
+    total_entries = totals['total_entries']
     
     utilization_rate = Decimal('0')
     if total_allocated > 0:
@@ -2042,7 +2245,7 @@ def export_budget_allocation_report_pdf(request):
         'generated_by': request.user.get_full_name(),
         'date_generated': datetime.now(),
         'fiscal_year': selected_year,
-        'allocations': allocations,
+        'allocations': allocations.iterator(chunk_size=200),
         'total_allocated': total_allocated,
         'total_used': total_used,
         'total_remaining': total_remaining,
@@ -2122,7 +2325,7 @@ def export_admin_pr_report_pdf(request):
             'status': status,
             'department': department
         },
-        'purchase_requests': requests_qs,
+        'purchase_requests': requests_qs.iterator(chunk_size=200),
         'total_requests': total_requests,
         'total_pending_amount': total_pending_amount,
         'total_approved_amount': total_approved_amount,
@@ -2200,7 +2403,7 @@ def export_admin_ad_report_pdf(request):
             'status': status,
             'department': department
         },
-        'activity_designs': ads_qs,
+        'activity_designs': ads_qs.iterator(chunk_size=200),
         'total_requests': total_requests,
         'total_pending_amount': total_pending_amount,
         'total_approved_amount': total_approved_amount,
@@ -2250,20 +2453,12 @@ def export_admin_pre_report_pdf(request):
     
     # 3. Apply Filters
     if search_query:
-        pre_qs = pre_qs.filter(
-            Q(id__icontains=search_query) |
-            Q(submitted_by__first_name__icontains=search_query) |
-            Q(submitted_by__last_name__icontains=search_query) |
-            Q(submitted_by__username__icontains=search_query)
-        )
+        pre_qs = pre_qs.filter(pre_search_q(search_query))
     if department:
         pre_qs = pre_qs.filter(department=department)
     if status:
         pre_qs = pre_qs.filter(status=status)
-    if date_from:
-        pre_qs = pre_qs.filter(submitted_at__date__gte=date_from)
-    if date_to:
-        pre_qs = pre_qs.filter(submitted_at__date__lte=date_to)
+    pre_qs = pre_qs.filter(date_range_q('submitted_at', date_from, date_to))
         
     # 4. Calculate Summaries
     total_requests = pre_qs.count()
@@ -2294,7 +2489,7 @@ def export_admin_pre_report_pdf(request):
             'date_from': date_from,
             'date_to': date_to
         },
-        'pres': pre_qs,
+        'pres': pre_qs.iterator(chunk_size=200),
         'total_requests': total_requests,
         'total_pending': total_pending,
         'total_approved': total_approved,
@@ -2358,13 +2553,14 @@ def export_admin_realignment_report_pdf(request):
     total_amount_displayed = aggs['total_amount_displayed'] or Decimal('0')
 
     # Fix: Replace ₱ with Php for PDF compatibility
-    # Evaluating queryset to list to allow in-memory modification
-    realignments_list = list(qs)
-    for req in realignments_list:
-        if req.source_item_display:
-            req.source_item_display = req.source_item_display.replace('₱', 'Php ').replace('ï¿½', '') 
-        if req.target_item_display:
-            req.target_item_display = req.target_item_display.replace('₱', 'Php ').replace('ï¿½', '')
+    # Rows are cleaned as they stream out of the cursor, one chunk at a time
+    def clean_realignments(rows):
+        for req in rows:
+            if req.source_item_display:
+                req.source_item_display = req.source_item_display.replace('₱', 'Php ').replace('ï¿½', '') 
+            if req.target_item_display:
+                req.target_item_display = req.target_item_display.replace('₱', 'Php ').replace('ï¿½', '')
+            yield req
 
     # 5. Context
     context = {
@@ -2375,7 +2571,7 @@ def export_admin_realignment_report_pdf(request):
         'filters': {
             'status': status
         },
-        'realignments': realignments_list,
+        'realignments': clean_realignments(qs.iterator(chunk_size=200)),
         'total_requests': total_requests,
         'total_pending': total_pending,
         'total_approved': total_approved,
@@ -2447,7 +2643,7 @@ class ArchiveCenterView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
             'archived_realignments': realignments,
             'selected_year': selected_year,
             # Get all available years from archived budgets for the filter
-            'avail_years': ApprovedBudget.all_objects.filter(is_archived=True).values_list('fiscal_year', flat=True).distinct().order_by('-fiscal_year')
+            'avail_years': get_archived_years()
         })
         return context
 
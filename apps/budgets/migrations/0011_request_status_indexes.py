@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0010_alter_prebudgetrealignment_approved_documents_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='departmentpre',
+            index=models.Index(fields=['status'], name='pre_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['status'], name='pr_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitydesign',
+            index=models.Index(fields=['status'], name='ad_status_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-16 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0011_request_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budgetallocation',
+            index=models.Index(fields=['is_active', '-allocated_at'], name='alloc_active_allocated_idx'),
+        ),
+    ]
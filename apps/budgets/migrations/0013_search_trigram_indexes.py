@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-16 12:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from apps.core.migration_ops import AddPostgresIndex
+
+# Trigram GIN indexes on UPPER(col), the expression Django's icontains compares
+# on PostgreSQL, so the list searches can use them.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0012_budgetallocation_active_allocated_index'),
+    ]
+
+    operations = [
+        # CreateExtension is a no-op on other backends
+        TrigramExtension(),
+        AddPostgresIndex(
+            model_name='approvedbudget',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'
+                ),
+                name='approvedbudget_title_trgm',
+            ),
+        ),
+        AddPostgresIndex(
+            model_name='approvedbudget',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'
+                ),
+                name='approvedbudget_desc_trgm',
+            ),
+        ),
+    ]
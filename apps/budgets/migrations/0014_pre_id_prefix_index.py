@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-16 14:05
+
+from django.db import migrations
+
+# The admin PRE search matches pasted ID prefixes ("PRE-1A2B3C4D") with
+# id::text LIKE '1a2b3c4d%'. A text_pattern_ops expression index serves that
+# lookup on PostgreSQL; other backends (local SQLite) skip it.
+
+
+def create_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS pre_id_text_prefix_idx '
+        'ON budgets_departmentpre ((id::text) text_pattern_ops)'
+    )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS pre_id_text_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0013_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
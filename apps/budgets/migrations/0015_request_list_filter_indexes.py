@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-16 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0014_pre_id_prefix_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='departmentpre',
+            index=models.Index(fields=['status', 'department', '-submitted_at'], name='pre_sdd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['status', 'department', '-created_at'], name='pr_sdd_idx'),
+        ),
+    ]
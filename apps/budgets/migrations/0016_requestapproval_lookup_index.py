@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-16 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0015_request_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='requestapproval',
+            index=models.Index(fields=['content_type', 'object_id', '-approved_at'], name='reqappr_lookup_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-16 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0016_requestapproval_lookup_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='departmentpre',
+            index=models.Index(
+                condition=models.Q(('status', 'Draft'), _negated=True),
+                fields=['-submitted_at'],
+                name='pre_nondraft_submitted_idx',
+            ),
+        ),
+    ]
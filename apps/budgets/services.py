@@ -8,6 +8,8 @@ from .models import (
     ActivityDesign, 
     PREBudgetRealignment
 )
+from apps.admin_panel.utils import invalidate_dashboard_cache
+from .utils import invalidate_available_years, invalidate_request_filter_options
 
 def archive_budget_cascade(budget_id, archive_type='FISCAL_YEAR', user=None):
     """
@@ -23,6 +25,9 @@ def archive_budget_cascade(budget_id, archive_type='FISCAL_YEAR', user=None):
     timestamp = timezone.now()
     
     with transaction.atomic():
+        # The cascades use update(), which skips the post_save cache receivers
+        transaction.on_commit(invalidate_dashboard_cache)
+        transaction.on_commit(invalidate_request_filter_options)
         # 1. Archive the Parent (Approved Budget)
         # We fetch specific instance to trigger logic if needed, but use update for consistency if multiple
         ApprovedBudget.all_objects.filter(pk=budget_id).update(
@@ -31,6 +36,8 @@ def archive_budget_cascade(budget_id, archive_type='FISCAL_YEAR', user=None):
             archived_at=timestamp,
             archived_by=user
         )
+        # update() bypasses post_save, so drop the cached year list here
+        transaction.on_commit(invalidate_available_years)
         
         # 2. Get Allocations (Level 1)
         # We need the IDs or QuerySet to filter children
@@ -91,8 +98,11 @@ def restore_budget_cascade(budget_id):
     Prevents restoring manually archived items.
     """
     with transaction.atomic():
+        transaction.on_commit(invalidate_dashboard_cache)
+        transaction.on_commit(invalidate_request_filter_options)
         # 1. Restore Parent
         ApprovedBudget.all_objects.filter(pk=budget_id).update(is_archived=False, archive_type='')
+        transaction.on_commit(invalidate_available_years)
         
         # 2. Get Allocations
         allocation_qs = BudgetAllocation.all_objects.filter(approved_budget_id=budget_id)
@@ -135,6 +145,8 @@ def archive_allocation_cascade(allocation_id, archive_type='MANUAL', user=None):
     timestamp = timezone.now()
     
     with transaction.atomic():
+        transaction.on_commit(invalidate_dashboard_cache)
+        transaction.on_commit(invalidate_request_filter_options)
         # 1. Archive the Allocation
         # Use update matches model structure
         allocation_qs = BudgetAllocation.all_objects.filter(pk=allocation_id)
@@ -191,6 +203,8 @@ def restore_allocation_cascade(allocation_id):
     assuming admin intent is to force restore.
     """
     with transaction.atomic():
+        transaction.on_commit(invalidate_dashboard_cache)
+        transaction.on_commit(invalidate_request_filter_options)
         # 1. Restore the Allocation
         allocation_qs = BudgetAllocation.all_objects.filter(pk=allocation_id)
         allocation_qs.update(is_archived=False, archive_type='')
@@ -1,9 +1,19 @@
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import F
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
-from .models import ApprovedBudget, BudgetAllocation
+from apps.admin_panel.utils import invalidate_dashboard_cache
+
+from .models import ApprovedBudget, BudgetAllocation, DepartmentPRE, PurchaseRequest, ActivityDesign
+from .utils import (
+    invalidate_available_years,
+    PRE_DEPARTMENTS_CACHE_KEY,
+    PR_DEPARTMENTS_CACHE_KEY,
+    AD_DEPARTMENTS_CACHE_KEY,
+    PR_YEARS_CACHE_KEY,
+)
 
 
 def _apply_budget_delta(approved_budget_id, delta):
@@ -84,4 +94,46 @@ def sync_parent_budget_on_allocation_save(sender, instance, created, **kwargs):
 def restore_parent_budget_on_allocation_delete(sender, instance, **kwargs):
     """Return allocated funds back to the parent budget when allocation is deleted."""
     with transaction.atomic():
-        _apply_budget_delta(instance.approved_budget_id, instance.allocated_amount)
\ No newline at end of file
+        _apply_budget_delta(instance.approved_budget_id, instance.allocated_amount)
+
+
+@receiver(post_save, sender=ApprovedBudget)
+@receiver(post_delete, sender=ApprovedBudget)
+@receiver(post_save, sender=BudgetAllocation)
+@receiver(post_delete, sender=BudgetAllocation)
+@receiver(post_save, sender=DepartmentPRE)
+@receiver(post_delete, sender=DepartmentPRE)
+@receiver(post_save, sender=PurchaseRequest)
+@receiver(post_delete, sender=PurchaseRequest)
+@receiver(post_save, sender=ActivityDesign)
+@receiver(post_delete, sender=ActivityDesign)
+def invalidate_dashboard_on_budget_change(sender, **kwargs):
+    """Budget totals, department metrics and request counts on the admin dashboard are cached."""
+    # After commit, so the cache write stays out of the saving transaction
+    transaction.on_commit(invalidate_dashboard_cache)
+
+
+@receiver(post_save, sender=ApprovedBudget)
+@receiver(post_delete, sender=ApprovedBudget)
+def invalidate_available_years_on_budget_change(sender, **kwargs):
+    """A new, deleted or (un)archived budget can change the fiscal year filter options."""
+    transaction.on_commit(invalidate_available_years)
+
+
+@receiver(post_save, sender=DepartmentPRE)
+@receiver(post_delete, sender=DepartmentPRE)
+def invalidate_pre_departments(sender, **kwargs):
+    transaction.on_commit(lambda: cache.delete(PRE_DEPARTMENTS_CACHE_KEY))
+
+
+@receiver(post_save, sender=PurchaseRequest)
+@receiver(post_delete, sender=PurchaseRequest)
+def invalidate_pr_filter_options(sender, **kwargs):
+    """New, deleted or (un)archived PRs can change the department and year filters."""
+    transaction.on_commit(lambda: cache.delete_many([PR_DEPARTMENTS_CACHE_KEY, PR_YEARS_CACHE_KEY]))
+
+
+@receiver(post_save, sender=ActivityDesign)
+@receiver(post_delete, sender=ActivityDesign)
+def invalidate_ad_departments(sender, **kwargs):
+    transaction.on_commit(lambda: cache.delete(AD_DEPARTMENTS_CACHE_KEY))
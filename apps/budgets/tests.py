@@ -1,3 +1,128 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.budgets.models import (
+    ApprovedBudget,
+    BudgetAllocation,
+    DepartmentPRE,
+    PRECategory,
+    PRELineItem,
+    PurchaseRequest,
+    PurchaseRequestAllocation,
+)
+from apps.user_accounts.models import User
+
+
+class BudgetTestData(TestCase):
+    """One allocation with an approved PRE and two line items"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'enduser', 'End User', 'enduser@example.com', 'pass1234', department='Registrar'
+        )
+        budget = ApprovedBudget.objects.create(
+            title='Annual Budget 2026', fiscal_year='2026', amount=Decimal('100000.00')
+        )
+        cls.allocation = BudgetAllocation.objects.create(
+            approved_budget=budget,
+            department='Registrar',
+            end_user=cls.user,
+            allocated_amount=Decimal('10000.00'),
+            remaining_balance=Decimal('10000.00'),
+        )
+        cls.pre = DepartmentPRE.objects.create(
+            submitted_by=cls.user,
+            department='Registrar',
+            fiscal_year='2026',
+            budget_allocation=cls.allocation,
+            status='Approved',
+        )
+        category = PRECategory.objects.create(name='MOOE', category_type='MOOE', code='MOOE')
+        cls.item = PRELineItem.objects.create(
+            pre=cls.pre, category=category, item_name='Office Supplies',
+            q1_amount=Decimal('1000.00'), q2_amount=Decimal('500.00'),
+            q3_amount=Decimal('250.00'), q4_amount=Decimal('0.00'),
+        )
+        cls.other_item = PRELineItem.objects.create(
+            pre=cls.pre, category=category, item_name='Travel',
+            q1_amount=Decimal('300.00'),
+        )
+
+    def make_pr(self, number, status, allocations):
+        pr = PurchaseRequest.objects.create(
+            submitted_by=self.user,
+            department='Registrar',
+            pr_number=number,
+            budget_allocation=self.allocation,
+            purpose='Testing',
+            status=status,
+        )
+        for item, quarter, amount in allocations:
+            PurchaseRequestAllocation.objects.create(
+                purchase_request=pr, pre_line_item=item, quarter=quarter, allocated_amount=amount
+            )
+        return pr
+
+
+class BulkQuarterBreakdownTests(BudgetTestData):
+    def test_matches_per_item_breakdown(self):
+        self.make_pr('PR-1', 'Approved', [(self.item, 'Q1', Decimal('300.00'))])
+        self.make_pr('PR-2', 'Pending', [
+            (self.item, 'Q1', Decimal('100.00')),
+            (self.other_item, 'Q1', Decimal('50.00')),
+        ])
+        self.make_pr('PR-3', 'Partially Approved', [(self.item, 'Q2', Decimal('70.00'))])
+        self.make_pr('PR-4', 'Rejected', [(self.item, 'Q2', Decimal('40.00'))])
+        self.make_pr('PR-5', 'Draft', [(self.item, 'Q3', Decimal('20.00'))])
+
+        breakdowns = PRELineItem.bulk_quarter_breakdown([self.item, self.other_item])
+
+        for item in (self.item, self.other_item):
+            expected = [item.get_quarter_breakdown(q) for q in ['Q1', 'Q2', 'Q3', 'Q4']]
+            self.assertEqual(breakdowns[item.id], expected)
+
+    def test_items_without_allocations(self):
+        breakdowns = PRELineItem.bulk_quarter_breakdown([self.item])
+
+        self.assertEqual(
+            breakdowns[self.item.id],
+            [self.item.get_quarter_breakdown(q) for q in ['Q1', 'Q2', 'Q3', 'Q4']],
+        )
+        self.assertEqual(breakdowns[self.item.id][0]['available'], Decimal('1000.00'))
+
+
+class SyncPRUsageTests(BudgetTestData):
+    def test_counts_only_approved_prs(self):
+        self.make_pr('PR-1', 'Approved', [(self.item, 'Q1', Decimal('300.00'))])
+        self.make_pr('PR-2', 'Pending', [(self.item, 'Q1', Decimal('100.00'))])
+
+        BudgetAllocation.sync_pr_usage([self.allocation.pk])
+
+        self.allocation.refresh_from_db()
+        self.assertEqual(self.allocation.pr_amount_used, Decimal('300.00'))
+        self.assertEqual(self.allocation.remaining_balance, Decimal('9700.00'))
+
+    def test_is_idempotent(self):
+        self.make_pr('PR-1', 'Approved', [
+            (self.item, 'Q1', Decimal('300.00')),
+            (self.other_item, 'Q1', Decimal('200.00')),
+        ])
+
+        for _ in range(3):
+            self.assertEqual(BudgetAllocation.sync_pr_usage([self.allocation.pk]), 1)
+            self.allocation.refresh_from_db()
+            self.assertEqual(self.allocation.pr_amount_used, Decimal('500.00'))
+            self.assertEqual(self.allocation.remaining_balance, Decimal('9500.00'))
+
+    def test_resets_usage_without_approved_prs(self):
+        BudgetAllocation.objects.filter(pk=self.allocation.pk).update(
+            pr_amount_used=Decimal('123.00'), remaining_balance=Decimal('0.00')
+        )
+
+        BudgetAllocation.sync_pr_usage([self.allocation.pk])
+
+        self.allocation.refresh_from_db()
+        self.assertEqual(self.allocation.pr_amount_used, Decimal('0.00'))
+        self.assertEqual(self.allocation.remaining_balance, Decimal('10000.00'))
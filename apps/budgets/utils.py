@@ -1,6 +1,98 @@
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models.functions import ExtractYear
 from decimal import Decimal
-from .models import BudgetTransaction
+from .models import ApprovedBudget, BudgetTransaction, DepartmentPRE, PurchaseRequest, ActivityDesign
+
+# Fiscal years only change when an approved budget is created, archived or restored
+AVAILABLE_YEARS_CACHE_KEY = 'approved_budget:years'
+ARCHIVED_YEARS_CACHE_KEY = 'approved_budget:archived_years'
+AVAILABLE_YEARS_CACHE_TIMEOUT = 60 * 60
+
+# Filter dropdown options for the PRE / PR / AD request lists
+PRE_DEPARTMENTS_CACHE_KEY = 'dept_list:pre'
+PR_DEPARTMENTS_CACHE_KEY = 'dept_list:pr'
+AD_DEPARTMENTS_CACHE_KEY = 'dept_list:ad'
+REQUEST_DEPARTMENTS_CACHE_TIMEOUT = 300
+PR_YEARS_CACHE_KEY = 'purchase_request:years'
+
+
+def get_available_years():
+    """Distinct fiscal years of (non-archived) approved budgets, newest first."""
+    return cache.get_or_set(
+        AVAILABLE_YEARS_CACHE_KEY,
+        lambda: list(
+            ApprovedBudget.objects.values_list('fiscal_year', flat=True).distinct().order_by('-fiscal_year')
+        ),
+        AVAILABLE_YEARS_CACHE_TIMEOUT,
+    )
+
+
+def get_archived_years():
+    """Distinct fiscal years of archived approved budgets, newest first."""
+    return cache.get_or_set(
+        ARCHIVED_YEARS_CACHE_KEY,
+        lambda: list(
+            ApprovedBudget.all_objects.filter(is_archived=True)
+            .values_list('fiscal_year', flat=True).distinct().order_by('-fiscal_year')
+        ),
+        AVAILABLE_YEARS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_available_years():
+    cache.delete_many([AVAILABLE_YEARS_CACHE_KEY, ARCHIVED_YEARS_CACHE_KEY])
+
+
+def _request_departments(model):
+    return list(model.objects.values_list('department', flat=True).distinct().order_by('department'))
+
+
+def get_pre_departments():
+    return cache.get_or_set(
+        PRE_DEPARTMENTS_CACHE_KEY,
+        lambda: _request_departments(DepartmentPRE),
+        REQUEST_DEPARTMENTS_CACHE_TIMEOUT,
+    )
+
+
+def get_pr_departments():
+    return cache.get_or_set(
+        PR_DEPARTMENTS_CACHE_KEY,
+        lambda: _request_departments(PurchaseRequest),
+        REQUEST_DEPARTMENTS_CACHE_TIMEOUT,
+    )
+
+
+def get_ad_departments():
+    return cache.get_or_set(
+        AD_DEPARTMENTS_CACHE_KEY,
+        lambda: _request_departments(ActivityDesign),
+        REQUEST_DEPARTMENTS_CACHE_TIMEOUT,
+    )
+
+
+def get_pr_years():
+    """Years that (non-archived) purchase requests were created in, newest first."""
+    return cache.get_or_set(
+        PR_YEARS_CACHE_KEY,
+        lambda: list(
+            PurchaseRequest.objects.annotate(year=ExtractYear('created_at'))
+            .values_list('year', flat=True).distinct().order_by('-year')
+        ),
+        AVAILABLE_YEARS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_request_filter_options():
+    """Drop every PRE / PR / AD department list and the PR year list."""
+    cache.delete_many([
+        PRE_DEPARTMENTS_CACHE_KEY,
+        PR_DEPARTMENTS_CACHE_KEY,
+        AD_DEPARTMENTS_CACHE_KEY,
+        PR_YEARS_CACHE_KEY,
+    ])
+
 
 def log_budget_transaction(allocation, amount, transaction_type, user, remarks='', update_allocation=True):
     """
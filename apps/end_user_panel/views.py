@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView, DetailView, ListView
-from django.db.models import Sum, Q, Exists, OuterRef, F, Value, DecimalField
+from django.db.models import Sum, Count, Q, Exists, OuterRef, F, Value, DecimalField, Prefetch
 from django.db.models.functions import Coalesce
 from django.contrib import messages
 from django.views import View
@@ -100,21 +100,16 @@ class EndUserDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
             context['remaining_percentage'] = 0
 
         # --- 2. Document Counts ---
-        # Active Documents (Total submitted)
-        pre_count = DepartmentPRE.objects.filter(submitted_by=user).count()
-        pr_count = PurchaseRequest.objects.filter(submitted_by=user).count()
-        ad_count = ActivityDesign.objects.filter(submitted_by=user).count()
-        
-        context['pre_count'] = pre_count
-        context['pr_count'] = pr_count
-        context['ad_count'] = ad_count
-        context['total_active_documents'] = pre_count + pr_count + ad_count
-
-        # Pending Counts
-        context['pending_pre_count'] = DepartmentPRE.objects.filter(submitted_by=user, status='Pending').count()
-        context['pending_pr_count'] = PurchaseRequest.objects.filter(submitted_by=user, status='Pending').count()
-        context['pending_ad_count'] = ActivityDesign.objects.filter(submitted_by=user, status='Pending').count()
+        # Active Documents (Total submitted) and Pending Counts, one query per model
+        for prefix, model in (('pre', DepartmentPRE), ('pr', PurchaseRequest), ('ad', ActivityDesign)):
+            counts = model.objects.filter(submitted_by=user).aggregate(
+                total=Count('id'),
+                pending=Count('id', filter=Q(status='Pending')),
+            )
+            context[f'{prefix}_count'] = counts['total']
+            context[f'pending_{prefix}_count'] = counts['pending']
         
+        context['total_active_documents'] = context['pre_count'] + context['pr_count'] + context['ad_count']
         context['total_pending'] = context['pending_pre_count'] + context['pending_pr_count'] + context['pending_ad_count']
 
         # --- 3. Recent Activity (Combined) ---
@@ -514,8 +509,8 @@ class ViewPREDetailView(LoginRequiredMixin, View):
                 'budget_allocation__approved_budget',
                 'submitted_by'
             ).prefetch_related(
-                'line_items__category',
-                'line_items__subcategory',
+                # Category/subcategory ride along in the line items query
+                Prefetch('line_items', queryset=PRELineItem.objects.select_related('category', 'subcategory')),
                 'supporting_documents',
                 'signed_approved_documents', # Important for "Documents Submitted" section
             ),
@@ -533,22 +528,19 @@ class ViewPREDetailView(LoginRequiredMixin, View):
         ).order_by('category__sort_order')
         # 3. Prepare Line Items with Budget Breakdown
         # This is CRITICAL for the "Budget Consumption Tracking" section.
-        # It relies on the pre-existing logic in `PRELineItem.get_quarter_breakdown(quarter)`.
+        # It relies on `PRELineItem.bulk_quarter_breakdown()`, which batches `get_quarter_breakdown`.
         line_items_with_breakdown = []
         
         # Determine if we should show breakdown (only if approved/active OR archived)
         if pre.status == 'Approved' or pre.is_archived: 
-             for item in pre.line_items.all():
-                item_data = {
+             line_items = list(pre.line_items.all())
+             # Usage stats (Original, PR Consumed, AD Consumed, Available) for all quarters
+             breakdowns = PRELineItem.bulk_quarter_breakdown(line_items)
+             for item in line_items:
+                line_items_with_breakdown.append({
                     'item': item,
-                    'quarters': []
-                }
-                for quarter in ['Q1', 'Q2', 'Q3', 'Q4']:
-                    # Call the model method to get usage stats (Original, PR Consumed, AD Consumed, Available)
-                    breakdown = item.get_quarter_breakdown(quarter)
-                    item_data['quarters'].append(breakdown)
-                
-                line_items_with_breakdown.append(item_data)
+                    'quarters': breakdowns[item.id],
+                })
         # 4. Filter Specific Document Types (Optional helpers for template)
         # You can also filter these in the template using the `document_type` field if available
         # or just pass `pre.signed_approved_documents.all()` as is.
@@ -1262,19 +1254,22 @@ def pr_ad_list(request):
         budget_allocation__in=budget_allocations
     ).order_by('-created_at')
     # 4. Calculate Summary Statistics
-    pr_pending_count = purchase_requests.filter(status='Pending').count()
-    pr_approved_count = purchase_requests.filter(status='Approved').count()
-    
-    ad_pending_count = activity_designs.filter(status='Pending').count()
-    ad_approved_count = activity_designs.filter(status='Approved').count()
+    pr_counts = purchase_requests.aggregate(
+        pending=Count('id', filter=Q(status='Pending')),
+        approved=Count('id', filter=Q(status='Approved')),
+    )
+    ad_counts = activity_designs.aggregate(
+        pending=Count('id', filter=Q(status='Pending')),
+        approved=Count('id', filter=Q(status='Approved')),
+    )
     # 5. Context
     context = {
         'purchase_requests': purchase_requests,
         'activity_designs': activity_designs,
-        'pr_pending_count': pr_pending_count,
-        'pr_approved_count': pr_approved_count,
-        'ad_pending_count': ad_pending_count,
-        'ad_approved_count': ad_approved_count,
+        'pr_pending_count': pr_counts['pending'],
+        'pr_approved_count': pr_counts['approved'],
+        'ad_pending_count': ad_counts['pending'],
+        'ad_approved_count': ad_counts['approved'],
     }
     return render(request, 'end_user_panel/purchase_request_list.html', context)
 
@@ -1293,7 +1288,9 @@ def purchase_request_upload(request):
         is_active=True,
         approved_budget__fiscal_year=current_fiscal_year
     ).select_related('approved_budget')
-    auto_selected_allocation = budget_allocations.first() if budget_allocations.count() == 1 else None
+    # The dropdown renders every allocation anyway, so evaluate once and reuse the
+    # result cache instead of a separate COUNT and LIMIT 1 query
+    auto_selected_allocation = budget_allocations[0] if len(budget_allocations) == 1 else None
     if request.method == 'POST':
         action = request.POST.get('action')
         
@@ -2092,10 +2089,10 @@ class PREBudgetRealignmentView(LoginRequiredMixin, UserPassesTestMixin, FormView
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Check if user has any approved PREs
-        context['approved_pres_count'] = DepartmentPRE.objects.filter(
+        context['has_approved_pres'] = DepartmentPRE.objects.filter(
             submitted_by=self.request.user, 
             status='Approved'
-        ).count()
+        ).exists()
         return context
 
     def form_valid(self, form):
@@ -2382,14 +2379,19 @@ class PREBudgetRealignmentHistoryView(LoginRequiredMixin, UserPassesTestMixin, L
         context = super().get_context_data(**kwargs)
         
         # Base Queryset for this user (ignoring the current page filter)
-        user_requests = PREBudgetRealignment.objects.filter(requested_by=self.request.user)
-        
-        context['total_requests'] = user_requests.count()
-        context['pending_count'] = user_requests.filter(
-            status__in=['Pending', 'Partially Approved', 'Awaiting Admin Verification']
-        ).count()
-        context['approved_count'] = user_requests.filter(status='Approved').count()
-        context['rejected_count'] = user_requests.filter(status='Rejected').count()
+        counts = PREBudgetRealignment.objects.filter(requested_by=self.request.user).aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(
+                status__in=['Pending', 'Partially Approved', 'Awaiting Admin Verification']
+            )),
+            approved=Count('id', filter=Q(status='Approved')),
+            rejected=Count('id', filter=Q(status='Rejected')),
+        )
+        
+        context['total_requests'] = counts['total']
+        context['pending_count'] = counts['pending']
+        context['approved_count'] = counts['approved']
+        context['rejected_count'] = counts['rejected']
         
         context['status_choices'] = PREBudgetRealignment.STATUS_CHOICES
         context['status_filter'] = self.request.GET.get('status', '')
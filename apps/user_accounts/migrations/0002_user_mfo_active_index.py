@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-16 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['mfo', 'is_active'], name='user_mfo_active_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-16 12:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from apps.core.migration_ops import AddPostgresIndex
+
+# Trigram GIN indexes on UPPER(col), the expression Django's icontains compares
+# on PostgreSQL, so the list searches can use them.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_accounts', '0002_user_mfo_active_index'),
+    ]
+
+    operations = [
+        # CreateExtension is a no-op on other backends
+        TrigramExtension(),
+        AddPostgresIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('fullname'), name='gin_trgm_ops'
+                ),
+                name='user_fullname_trgm',
+            ),
+        ),
+        AddPostgresIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('username'), name='gin_trgm_ops'
+                ),
+                name='user_username_trgm',
+            ),
+        ),
+        AddPostgresIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('email'), name='gin_trgm_ops'
+                ),
+                name='user_email_trgm',
+            ),
+        ),
+    ]
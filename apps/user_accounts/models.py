@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 
@@ -100,6 +102,17 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "position", "fullname", "department"]
 
+    class Meta:
+        indexes = [
+            # End-user dropdown on the allocation form (users by MFO)
+            models.Index(fields=['mfo', 'is_active'], name='user_mfo_active_idx'),
+            # Trigram indexes for the user searches' icontains, i.e. UPPER(col) LIKE
+            # UPPER(...). Built on PostgreSQL only (see migration 0003).
+            GinIndex(OpClass(Upper('fullname'), name='gin_trgm_ops'), name='user_fullname_trgm'),
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='user_username_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm'),
+        ]
+
     def save(self, *args, **kwargs):
         """Ensure admin users have correct permissions."""
         if self.is_admin:
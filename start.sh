@@ -4,6 +4,11 @@ set -e
 echo "Running Database Migrations..."
 python manage.py migrate --noinput
 
+if [ -z "$REDIS_URL" ] && [ "${GUNICORN_WORKERS:-1}" -gt 1 ]; then
+    # Without a shared cache each worker caches (and invalidates) on its own
+    echo "Warning: REDIS_URL is not set; dashboard and filter caches are per-worker."
+fi
+
 echo "Checking for Superuser creation..."
 # If superuser details are provided in environment variables, create one automatically
 if [ -n "$SUPERUSER_USERNAME" ] && [ -n "$SUPERUSER_EMAIL" ] && [ -n "$SUPERUSER_PASSWORD" ]; then